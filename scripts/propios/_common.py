@@ -0,0 +1,343 @@
+# -*- coding: utf-8 -*-
+"""
+Utilidades compartidas por los scripts de scripts/propios.
+Cada función se define una sola vez, así que su caché también es única: cuando
+setup-all ejecuta los pasos en el mismo proceso, la raíz de chroma_mcp_server
+y el mcp.json solo se calculan/parsean una vez.
+"""
+import os
+import sys
+import json
+import re
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+# orjson es opcional: si está instalado se usa para leer y escribir mcp.json.
+# orjson.JSONDecodeError hereda de json.JSONDecodeError, así que los except no cambian.
+try:
+    import orjson
+    
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+def _utf8_setup() -> None:
+    """
+    Configura UTF-8 en stdin/stdout/stderr, solo en los streams que no la tengan
+    ya (con una locale UTF-8 o PYTHONUTF8=1 no hay nada que hacer). Se mantiene
+    el except: cuando setup-all ejecuta los pasos en el mismo proceso, stdout
+    puede ser un proxy sin reconfigure().
+    """
+    for stream in (sys.stdin, sys.stdout, sys.stderr):
+        if (getattr(stream, 'encoding', None) or '').lower().replace('-', '') != 'utf8':
+            try:
+                stream.reconfigure(encoding='utf-8')
+            except (AttributeError, ValueError):
+                os.environ['PYTHONIOENCODING'] = 'utf-8'
+
+# Marcadores que identifican la raíz de chroma_mcp_server
+ROOT_MARKERS = frozenset(("pyproject.toml", "Makefile", ".git"))
+
+@lru_cache(maxsize=1)
+def get_chroma_mcp_server_root() -> Path:
+    """
+    Obtiene la raíz del proyecto chroma_mcp_server buscando marcadores como
+    pyproject.toml o Makefile, empezando desde el directorio de scripts/propios.
+    """
+    script_dir = Path(__file__).parent.resolve()
+
+    # Buscar hasta 5 niveles arriba; los padres de una ruta resuelta ya están resueltos
+    for current in (script_dir, *script_dir.parents)[:5]:
+        # Un scandir por nivel en lugar de un stat por marcador
+        try:
+            with os.scandir(current) as it:
+                names = {entry.name for entry in it}
+        except OSError:
+            continue
+        if ROOT_MARKERS & names:
+            return current
+
+    # Fallback: usar el cálculo relativo (dos niveles arriba desde scripts/propios)
+    return script_dir.parent.parent
+
+def _canonicalize(path_str: str) -> Path:
+    """Expande ~ y $VARS (solo si aparecen) y resuelve la ruta absoluta real."""
+    if '~' in path_str:
+        path_str = os.path.expanduser(path_str)
+    if '$' in path_str:
+        path_str = os.path.expandvars(path_str)
+    return Path(os.path.realpath(path_str))
+
+def _validate_dir(path: Path) -> Optional[str]:
+    """
+    Comprueba con un solo stat() que path existe y es un directorio.
+    Retorna None si es válido o el motivo del error para mostrarlo al usuario.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"La ruta {path} no existe"
+    if not stat.S_ISDIR(st.st_mode):
+        return f"{path} no es un directorio"
+    return None
+
+class DirError(Exception):
+    """Ruta de proyecto no válida; el mensaje se muestra tal cual al usuario."""
+
+def _require_dir(path: Path) -> Path:
+    """Retorna path si es un directorio existente; si no, lanza DirError."""
+    error = _validate_dir(path)
+    if error:
+        raise DirError(error)
+    return path
+
+def _prompt_dir(prompt: str, read_line: Callable[[str], str] = input) -> Path:
+    """
+    Pide una ruta por stdin (con read_line, input() por defecto) y la normaliza.
+    Lanza DirError si viene vacía. En una terminal carga readline para poder
+    editar la línea y recuperar los intentos anteriores con las flechas.
+    """
+    if sys.stdin.isatty():
+        try:
+            import readline  # noqa: F401
+        except ImportError:
+            pass
+    path_str = read_line(prompt).strip()
+    if not path_str:
+        raise DirError("La ruta no puede estar vacía")
+    return _canonicalize(path_str)
+
+@lru_cache(maxsize=None)
+def _load_mcp_json(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Parsea mcp.json. mtime_ns y size solo forman parte de la clave de la caché:
+    si el archivo cambia, la siguiente lectura lo vuelve a parsear.
+    """
+    # Lectura binaria: orjson (o json) decodifica el UTF-8 directamente
+    return _json_loads(Path(path_str).read_bytes())
+
+def read_mcp_json(mcp_json_path: Path, required: bool = True, hint: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Lee el archivo mcp.json y retorna su contenido (cacheado mientras no cambie).
+    El dict es compartido entre llamadas: quien necesite modificarlo debe
+    parsear el archivo por su cuenta.
+    
+    Si required es True, un archivo ausente o ilegible termina el script (con
+    hint como sugerencia adicional); si es False se avisa y se retorna {}.
+    """
+    try:
+        st = mcp_json_path.stat()
+    except FileNotFoundError:
+        if not required:
+            print(f"⚠️  No se encontró el archivo {mcp_json_path}", file=sys.stderr)
+            return {}
+        print(f"❌ Error: No se encontró el archivo {mcp_json_path}", file=sys.stderr)
+        if hint:
+            print(f"💡 {hint}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        return _load_mcp_json(str(mcp_json_path), st.st_mtime_ns, st.st_size)
+    except Exception as e:
+        # json.JSONDecodeError incluido: el mensaje ya indica línea y columna
+        print(f"❌ Error al leer {mcp_json_path}: {e}", file=sys.stderr)
+        if not required:
+            return {}
+        sys.exit(1)
+
+# Variables del env de chroma en el mcp.json necesarias para conectar a ChromaDB
+CHROMA_ENV_VARS = (
+    "CHROMA_CLIENT_TYPE",
+    "CHROMA_HOST",
+    "CHROMA_PORT",
+    "CHROMA_SSL",
+    "CHROMA_API_KEY",
+    "CHROMA_TENANT",
+    "CHROMA_DATABASE",
+    "CHROMA_DATA_DIR",
+    "CHROMA_EMBEDDING_FUNCTION",
+    "OPENAI_API_KEY",
+)
+
+def _env_str(value: Any) -> str:
+    """Convierte un escalar JSON del env a string (true/false en minúsculas, como en JSON)."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+def get_chroma_env_vars_from_mcp_json(mcp_config: Dict[str, Any], keys: Sequence[str] = CHROMA_ENV_VARS) -> Dict[str, str]:
+    """
+    Extrae del mcp.json las variables keys del env de chroma que estén definidas.
+    Se aceptan escalares JSON: un mcp.json editado a mano con "CHROMA_PORT": 8000
+    o "CHROMA_SSL": true sigue funcionando, y los valores se retornan como string.
+    """
+    chroma_config = mcp_config.get("mcpServers", {}).get("chroma", {})
+    env_vars = chroma_config.get("env", {})
+    return {k: _env_str(env_vars[k]) for k in keys if env_vars.get(k) is not None}
+
+# Líneas KEY=VALUE del .env: la clave debe ser un identificador (así los comentarios
+# con # no coinciden) y el valor puede ir entre comillas dobles o simples. Como en
+# python-dotenv, un # precedido de espacio tras el valor inicia un comentario
+_ENV_RE = re.compile(
+    r'''^[^\S\n]*([A-Za-z_][A-Za-z0-9_]*)[^\S\n]*=[^\S\n]*'''
+    r'''(?:"([^"\n]*)"|'([^'\n]*)'|([^\n]*?))'''
+    r'''(?:[^\S\n]+\#[^\n]*)?[^\S\n]*$''',
+    re.M,
+)
+
+def _parse_env_text(text: str) -> Dict[str, str]:
+    """Parsea el contenido de un .env en una sola pasada de regex; ignora comentarios y líneas vacías."""
+    # Cada coincidencia trae la clave y el valor en uno de los tres grupos
+    # (comillas dobles, simples o sin comillas); las comillas quedan fuera
+    return {
+        key: double or single or bare
+        for key, double, single, bare in _ENV_RE.findall(text)
+    }
+
+# Valores aceptados para las variables booleanas del mcp.json
+_TRUTHY = frozenset({"true", "1", "yes", "on", "t", "y"})
+_FALSY = frozenset({"false", "0", "no", "off", "f", "n"})
+
+def _parse_bool(value: Optional[str]) -> Optional[bool]:
+    """Convierte un string del mcp.json a bool; None si falta o no se reconoce."""
+    value = (value or "").strip().lower()
+    if value in _TRUTHY:
+        return True
+    if value in _FALSY:
+        return False
+    return None
+
+@contextmanager
+def pushd(target: Path) -> Iterator[None]:
+    """
+    Cambia al directorio target y vuelve al original al salir. El original se
+    guarda como descriptor abierto y se restaura con fchdir, sin resolver su
+    ruta otra vez (funciona aunque se haya renombrado mientras tanto).
+    """
+    if not hasattr(os, "fchdir"):
+        # Windows: sin fchdir se guarda la ruta
+        original_cwd = os.getcwd()
+        os.chdir(target)
+        try:
+            yield
+        finally:
+            os.chdir(original_cwd)
+        return
+
+    fd = os.open(".", os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    try:
+        os.chdir(target)
+        try:
+            yield
+        finally:
+            os.fchdir(fd)
+    finally:
+        os.close(fd)
+
+def parse_simple_argv(
+    argv: Optional[List[str]],
+    value_flags: Sequence[str],
+    bool_flags: Sequence[str],
+    build_parser: Callable[[], Any],
+) -> SimpleNamespace:
+    """
+    Parsea argv para los casos simples (--flag VALOR, --flag=VALOR y flags
+    booleanos) sin importar argparse. Ante -h/--help, un flag desconocido o
+    abreviado, o un flag sin valor, delega en build_parser() para que argparse
+    muestre la ayuda o el error estándar.
+    """
+    args = list(sys.argv[1:] if argv is None else argv)
+    values: Dict[str, Any] = {flag[2:].replace('-', '_'): None for flag in value_flags}
+    values.update({flag[2:].replace('-', '_'): False for flag in bool_flags})
+    
+    i = 0
+    while i < len(args):
+        name, sep, inline_value = args[i].partition('=')
+        if name in value_flags:
+            if sep:
+                value = inline_value
+            elif i + 1 < len(args):
+                i += 1
+                value = args[i]
+            else:
+                return build_parser().parse_args(args)
+            values[name[2:].replace('-', '_')] = value
+        elif args[i] in bool_flags:
+            values[args[i][2:].replace('-', '_')] = True
+        else:
+            return build_parser().parse_args(args)
+        i += 1
+    
+    return SimpleNamespace(**values)
+
+class _StepOutput:
+    """Redirige print() de cada hilo a su propio buffer.
+    
+    Permite ejecutar los pasos en paralelo y mostrar luego la salida de cada
+    uno completa y en orden, sin líneas mezcladas en la terminal.
+    """
+    
+    def __init__(self, stream, local: threading.local):
+        self._stream = stream
+        self._local = local
+    
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            return self._stream.write(text)
+        buffer.append((self._stream, text))
+        return len(text)
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+def run_steps_concurrently(steps: Sequence[Tuple[str, Callable[[], Any]]], subtitle: str = "") -> List[Any]:
+    """
+    Ejecuta en paralelo pasos (título, función sin argumentos) independientes y
+    no interactivos. Retorna sus resultados en el mismo orden que steps (False
+    si el paso lanzó una excepción). La salida de cada paso se imprime al
+    terminar, precedida de su título y, si se indica, de subtitle.
+    """
+    local = threading.local()
+    original_stdout, original_stderr = sys.stdout, sys.stderr
+    
+    def _run(func: Callable[[], Any]):
+        local.buffer = []
+        try:
+            return func(), local.buffer
+        except Exception as e:
+            print(f"❌ Error inesperado: {e}", file=sys.stderr)
+            return False, local.buffer
+    
+    # sys.stdout/sys.stderr son globales al proceso: se sustituyen solo mientras
+    # corren los pasos, y los hilos que no son de un paso escriben directamente
+    sys.stdout = _StepOutput(original_stdout, local)
+    sys.stderr = _StepOutput(original_stderr, local)
+    try:
+        with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+            futures = [executor.submit(_run, func) for _, func in steps]
+            results = []
+            for (title, _), future in zip(steps, futures):
+                result, output = future.result()
+                original_stdout.write("\n" + "=" * 60 + "\n" + title + "\n" + "=" * 60 + "\n")
+                if subtitle:
+                    original_stdout.write(subtitle + "\n\n")
+                for stream, text in output:
+                    stream.write(text)
+                results.append(result)
+    finally:
+        sys.stdout, sys.stderr = original_stdout, original_stderr
+    
+    return results
@@ -8,99 +8,40 @@ import os
 import sys
 import json
 import argparse
+import functools
 import shutil
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-# Configurar codificación UTF-8 para stdin/stdout/stderr
-if sys.version_info >= (3, 7):
-    try:
-        sys.stdin.reconfigure(encoding='utf-8')
-        sys.stdout.reconfigure(encoding='utf-8')
-        sys.stderr.reconfigure(encoding='utf-8')
-    except (AttributeError, ValueError):
-        os.environ['PYTHONIOENCODING'] = 'utf-8'
-else:
-    os.environ['PYTHONIOENCODING'] = 'utf-8'
+# Utilidades compartidas con el resto de scripts de scripts/propios
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import get_chroma_mcp_server_root, _canonicalize, read_mcp_json, _json_loads, _json_dumps, _parse_bool, run_steps_concurrently, _require_dir, _prompt_dir, DirError, get_chroma_env_vars_from_mcp_json, _utf8_setup
 
-def get_chroma_mcp_server_root() -> Path:
-    """Obtiene la raíz del proyecto chroma_mcp_server."""
-    script_dir = Path(__file__).parent.resolve()
-    current = script_dir
-    markers = ["pyproject.toml", "Makefile", ".git"]
-    
-    for _ in range(5):
-        for marker in markers:
-            if (current / marker).exists():
-                return current.resolve()
-        parent = current.parent
-        if parent == current:
-            break
-        current = parent
-    
-    fallback_root = script_dir.parent.parent
-    return fallback_root.resolve()
+# Configurar codificación UTF-8 para stdin/stdout/stderr
+_utf8_setup()
 
 def get_project_path(project_path_arg: Optional[str] = None) -> Path:
     """Obtiene la ruta del proyecto destino, ya sea desde argumento o preguntando al usuario."""
     if project_path_arg:
-        project_path = os.path.expanduser(project_path_arg)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"❌ Error: La ruta {project_path} no existe.", file=sys.stderr)
-            sys.exit(1)
-        
-        if not project_path.is_dir():
-            print(f"❌ Error: {project_path} no es un directorio.", file=sys.stderr)
+        # Un solo stat() para comprobar que existe y que es un directorio
+        try:
+            return _require_dir(_canonicalize(project_path_arg))
+        except DirError as e:
+            print(f"❌ Error: {e}.", file=sys.stderr)
             sys.exit(1)
-        
-        return project_path
     
-    # Si no se pasó argumento, preguntar interactivamente
+    # Si no se pasó argumento, preguntar interactivamente hasta obtener una ruta válida
     while True:
         try:
-            project_path = input("📁 Ingresa la ruta del proyecto a limpiar: ").strip()
+            return _require_dir(_prompt_dir("📁 Ingresa la ruta del proyecto a limpiar: "))
+        except DirError as e:
+            print(f"⚠️  {e}. Intenta de nuevo.")
         except UnicodeError as e:
             print(f"⚠️  Error de codificación al leer la entrada: {e}", file=sys.stderr)
             print("💡 Intenta ejecutar el script con: PYTHONIOENCODING=utf-8 python3 clean-project.py", file=sys.stderr)
             sys.exit(1)
-        
-        if not project_path:
-            print("⚠️  La ruta no puede estar vacía. Intenta de nuevo.")
-            continue
-        
-        project_path = os.path.expanduser(project_path)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"⚠️  La ruta {project_path} no existe. Intenta de nuevo.")
-            continue
-        
-        if not project_path.is_dir():
-            print(f"⚠️  {project_path} no es un directorio. Intenta de nuevo.")
-            continue
-        
-        return project_path
-
-def read_mcp_json(mcp_json_path: Path) -> Dict[str, Any]:
-    """Lee el archivo mcp.json y retorna su contenido."""
-    if not mcp_json_path.exists():
-        print(f"⚠️  No se encontró el archivo {mcp_json_path}", file=sys.stderr)
-        return {}
-    
-    try:
-        with open(mcp_json_path, 'r', encoding='utf-8') as f:
-            mcp_config = json.load(f)
-        return mcp_config
-    except json.JSONDecodeError as e:
-        print(f"❌ Error al leer {mcp_json_path}: {e}", file=sys.stderr)
-        return {}
-    except Exception as e:
-        print(f"❌ Error al leer {mcp_json_path}: {e}", file=sys.stderr)
-        return {}
 
 def get_chroma_tenant_from_mcp_json(mcp_config: Dict[str, Any]) -> Optional[str]:
     """Extrae el valor de CHROMA_TENANT del archivo mcp.json."""
@@ -109,112 +50,123 @@ def get_chroma_tenant_from_mcp_json(mcp_config: Dict[str, Any]) -> Optional[str]
     tenant = env_vars.get("CHROMA_TENANT")
     return tenant
 
-def get_chroma_env_vars_from_mcp_json(mcp_config: Dict[str, Any]) -> Dict[str, str]:
-    """Extrae todas las variables de entorno relevantes del mcp.json."""
-    chroma_config = mcp_config.get("mcpServers", {}).get("chroma", {})
-    env_vars = chroma_config.get("env", {})
+@functools.lru_cache(maxsize=1)
+def _load_client_factory(src_dir: str):
+    """Importa get_client_and_ef la primera vez que se necesita.
     
-    # Variables relevantes para conectar a ChromaDB
-    relevant_vars = {
-        "CHROMA_CLIENT_TYPE": env_vars.get("CHROMA_CLIENT_TYPE"),
-        "CHROMA_HOST": env_vars.get("CHROMA_HOST"),
-        "CHROMA_PORT": env_vars.get("CHROMA_PORT"),
-        "CHROMA_SSL": env_vars.get("CHROMA_SSL"),
-        "CHROMA_API_KEY": env_vars.get("CHROMA_API_KEY"),
-        "CHROMA_TENANT": env_vars.get("CHROMA_TENANT"),
-        "CHROMA_DATABASE": env_vars.get("CHROMA_DATABASE"),
-        "CHROMA_DATA_DIR": env_vars.get("CHROMA_DATA_DIR"),
-        "CHROMA_EMBEDDING_FUNCTION": env_vars.get("CHROMA_EMBEDDING_FUNCTION"),
-        "OPENAI_API_KEY": env_vars.get("OPENAI_API_KEY"),
-    }
+    El import arrastra chromadb, numpy, onnxruntime, etc., así que solo se paga
+    cuando realmente hay colecciones que borrar.
+    """
+    # Agregar el directorio src al path para importar módulos
+    sys.path.insert(0, src_dir)
     
-    return {k: v for k, v in relevant_vars.items() if v is not None}
+    # Usar el cliente desde chroma_mcp_client (el que está en scripts/propios)
+    from chroma_mcp_client.connection import get_client_and_ef
+    return get_client_and_ef
+
+# Cliente de ChromaDB reutilizado entre pasos (p. ej. una verificación posterior al borrado)
+_chroma_client = None
 
-def delete_collections(tenant: str, env_vars: Dict[str, str], chroma_mcp_server_root: Path, project_path: Path) -> bool:
-    """Borra las colecciones de ChromaDB para el tenant especificado."""
+def get_chroma_client(tenant: str, env_vars: Dict[str, str], chroma_mcp_server_root: Path, project_path: Path):
+    """Retorna el cliente de ChromaDB del proyecto, creándolo solo la primera vez."""
+    global _chroma_client
+    if _chroma_client is not None:
+        return _chroma_client
+    
+    get_client_and_ef = _load_client_factory(str(chroma_mcp_server_root / "src"))
+    
+    # Convertir SSL de string a bool si está presente
+    ssl_val = _parse_bool(env_vars.get("CHROMA_SSL"))
+    
+    # Conectar a ChromaDB pasando TODOS los parámetros directamente
+    # Esto permite que cada ejecución tenga sus propias variables sin interferir.
+    # El .env del proyecto del usuario se pasa de forma explícita en lugar de
+    # hacer os.chdir() para que find_project_root() lo encuentre: el cwd es
+    # global al proceso y no debe cambiarse mientras otros pasos corren en hilos.
+    print("🔌 Conectando a ChromaDB...")
+    _chroma_client, _ = get_client_and_ef(
+        env_path=str(project_path / ".env"),
+        tenant=tenant,
+        database=env_vars.get("CHROMA_DATABASE"),
+        host=env_vars.get("CHROMA_HOST"),
+        port=env_vars.get("CHROMA_PORT"),
+        client_type=env_vars.get("CHROMA_CLIENT_TYPE"),
+        ssl=ssl_val,
+        api_key=env_vars.get("CHROMA_API_KEY"),
+        data_dir=env_vars.get("CHROMA_DATA_DIR"),
+        embedding_function=env_vars.get("CHROMA_EMBEDDING_FUNCTION"),
+        openai_api_key=env_vars.get("OPENAI_API_KEY"),
+    )
+    
+    return _chroma_client
+
+# Colecciones que crea chroma_mcp_client para cada proyecto
+COLLECTIONS_TO_DELETE = (
+    "codebase_v1",
+    "chat_history_v1",
+    "derived_learnings_v1",
+    "thinking_sessions_v1",
+    "validation_evidence_v1",
+    "test_results_v1",
+)
+
+# Línea de detalle por estado de cada colección
+COLLECTION_STATUS_MESSAGES = {
+    "deleted": "✅ Colección '{name}' borrada exitosamente",
+    "missing": "ℹ️  Colección '{name}' no existe, omitiendo",
+    "error": "⚠️  Error al borrar '{name}': {error}",
+}
+
+def delete_collections(tenant: str, env_vars: Dict[str, str], chroma_mcp_server_root: Path, project_path: Path, quiet: bool = False) -> bool:
+    """Borra las colecciones de ChromaDB para el tenant especificado.
+    
+    Con quiet=True solo se muestra el total de colecciones borradas.
+    """
     try:
-        # Agregar el directorio src al path para importar módulos
-        sys.path.insert(0, str(chroma_mcp_server_root / "src"))
-        
-        # Usar el cliente desde chroma_mcp_client (el que está en scripts/propios)
-        from chroma_mcp_client.connection import get_client_and_ef
-        
-        # Cambiar al directorio del proyecto del usuario para que find_project_root()
-        # encuentre el .env del proyecto del usuario si existe
-        original_cwd = os.getcwd()
-        try:
-            os.chdir(str(project_path))
-            
-            # Convertir SSL de string a bool si está presente
-            ssl_val = None
-            if "CHROMA_SSL" in env_vars:
-                ssl_str = env_vars["CHROMA_SSL"]
-                ssl_val = ssl_str.lower() in ["true", "1", "yes"]
-            
-            # Conectar a ChromaDB pasando TODOS los parámetros directamente
-            # Esto permite que cada ejecución tenga sus propias variables sin interferir
-            print("🔌 Conectando a ChromaDB...")
-            client, _ = get_client_and_ef(
-                tenant=tenant,
-                database=env_vars.get("CHROMA_DATABASE"),
-                host=env_vars.get("CHROMA_HOST"),
-                port=env_vars.get("CHROMA_PORT"),
-                client_type=env_vars.get("CHROMA_CLIENT_TYPE"),
-                ssl=ssl_val,
-                api_key=env_vars.get("CHROMA_API_KEY"),
-                data_dir=env_vars.get("CHROMA_DATA_DIR"),
-                embedding_function=env_vars.get("CHROMA_EMBEDDING_FUNCTION"),
-                openai_api_key=env_vars.get("OPENAI_API_KEY"),
-            )
-        finally:
-            # Restaurar el directorio original
-            os.chdir(original_cwd)
-        
-        # Colecciones a borrar
-        collections_to_delete = [
-            "codebase_v1",
-            "chat_history_v1",
-            "derived_learnings_v1",
-            "thinking_sessions_v1",
-            "validation_evidence_v1",
-            "test_results_v1"
-        ]
+        client = get_chroma_client(tenant, env_vars, chroma_mcp_server_root, project_path)
         
         print("🗑️  Borrando colecciones de ChromaDB...")
-        deleted_count = 0
         
-        for collection_name in collections_to_delete:
+        def _drop_one(collection_name: str):
+            """Borra una colección y retorna (nombre, estado, error)."""
             try:
-                # Intentar obtener la colección
-                collection = client.get_collection(name=collection_name)
-                count = collection.count()
-                
-                # Primero borrar todos los documentos de la colección
-                if count > 0:
-                    print(f"  🗑️  Borrando {count} documentos de '{collection_name}'...")
-                    # Obtener todos los IDs
-                    all_data = collection.get()
-                    if all_data and 'ids' in all_data and len(all_data['ids']) > 0:
-                        # Borrar todos los documentos por lotes
-                        batch_size = 100
-                        ids = all_data['ids']
-                        for i in range(0, len(ids), batch_size):
-                            batch_ids = ids[i:i+batch_size]
-                            collection.delete(ids=batch_ids)
-                        print(f"    ✅ {count} documentos borrados")
-                
-                # Luego borrar la colección
+                # Una sola petición: delete_collection ya borra los documentos
+                # con cualquier tipo de cliente, así que borrarlos antes por IDs
+                # es trabajo desperdiciado
                 client.delete_collection(name=collection_name)
-                print(f"✅ Colección '{collection_name}' borrada exitosamente")
-                deleted_count += 1
+                return collection_name, "deleted", None
             except Exception as e:
-                # Si la colección no existe, simplemente continuar
-                error_str = str(e).lower()
-                if "does not exist" in error_str or "not found" in error_str or "404" in error_str:
-                    print(f"ℹ️  Colección '{collection_name}' no existe, omitiendo")
-                else:
-                    print(f"⚠️  Error al borrar '{collection_name}': {e}")
-        
+                return collection_name, "error", e
+        
+        # Un solo list_collections() en lugar de un get_collection() fallido
+        # por cada colección que no existe (según la versión de chromadb
+        # retorna nombres u objetos Collection)
+        existing = {c if isinstance(c, str) else c.name for c in client.list_collections()}
+        to_drop = [name for name in COLLECTIONS_TO_DELETE if name in existing]
+        
+        # Cada colección es independiente: en http/cloud se borran en paralelo
+        # para solapar la latencia de red. Con un cliente local (persistent/
+        # ephemeral) no hay red que solapar y SQLite serializa las escrituras:
+        # se borran secuencialmente
+        if env_vars.get("CHROMA_CLIENT_TYPE") in ("http", "cloud"):
+            max_workers = len(to_drop)
+        else:
+            max_workers = 1
+        dropped = {}
+        if to_drop:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                dropped = {result[0]: result for result in executor.map(_drop_one, to_drop)}
+        
+        # Los resultados se muestran siempre en el orden de COLLECTIONS_TO_DELETE
+        results = [dropped.get(name, (name, "missing", None)) for name in COLLECTIONS_TO_DELETE]
+        
+        # El detalle se formatea una sola vez al final, y solo si se va a mostrar
+        if not quiet:
+            print("\n".join(
+                COLLECTION_STATUS_MESSAGES[status].format(name=name, error=err)
+                for name, status, err in results
+            ))
+        deleted_count = sum(1 for _, status, _ in results if status == "deleted")
         print(f"\n✅ {deleted_count} colecciones borradas.")
         return True
         
@@ -224,24 +176,25 @@ def delete_collections(tenant: str, env_vars: Dict[str, str], chroma_mcp_server_
         print(traceback.format_exc(), file=sys.stderr)
         return False
 
-def remove_chroma_from_mcp_json(mcp_json_path: Path) -> bool:
+def remove_chroma_from_mcp_json(mcp_json_path: Path, dry_run: bool = False) -> bool:
     """Elimina solo la entrada 'chroma' del mcp.json, preservando todas las demás entradas.
     
     Usa deserialización y serialización explícita de JSON para garantizar la integridad del archivo.
+    Con dry_run=True se muestra el JSON resultante sin escribirlo.
     """
+    mcp_json_exists = os.path.exists(mcp_json_path)
     print(f"🔍 Verificando archivo: {mcp_json_path}")
-    print(f"   ¿Existe?: {mcp_json_path.exists()}")
+    print(f"   ¿Existe?: {mcp_json_exists}")
     print(f"   ¿Es absoluto?: {mcp_json_path.is_absolute()}")
     
-    if not mcp_json_path.exists():
+    if not mcp_json_exists:
         print(f"ℹ️  El archivo {mcp_json_path} no existe, omitiendo...")
         return True
     
     try:
         # 1. DESERIALIZACIÓN: Leer el archivo JSON completo
         print(f"📖 Leyendo archivo JSON: {mcp_json_path}")
-        with open(mcp_json_path, 'r', encoding='utf-8') as f:
-            mcp_config = json.load(f)
+        mcp_config = _json_loads(mcp_json_path.read_bytes())
         
         # Validar estructura básica
         if not isinstance(mcp_config, dict):
@@ -290,9 +243,24 @@ def remove_chroma_from_mcp_json(mcp_json_path: Path) -> bool:
         else:
             print(f"ℹ️  mcpServers quedó vacío después de eliminar chroma, no se incluirá en el archivo")
         
-        # 3. SERIALIZACIÓN: Guardar el nuevo JSON completo
-        with open(mcp_json_path, 'w', encoding='utf-8') as f:
-            json.dump(new_mcp_config, f, indent=2, ensure_ascii=False)
+        if dry_run:
+            print(f"🔎 [dry-run] {mcp_json_path} quedaría así:")
+            print(_json_dumps(new_mcp_config).decode('utf-8'))
+            return True
+
+        # 3. SERIALIZACIÓN: Guardar el nuevo JSON completo de forma atómica
+        # (archivo temporal + os.replace para no dejar un mcp.json truncado)
+        # El temporal recibe los permisos del original (p. ej. 0600 si guarda API keys)
+        # y se borra si algo falla antes de reemplazarlo
+        original_mode = stat.S_IMODE(os.stat(mcp_json_path).st_mode)
+        tmp_path = mcp_json_path.with_suffix('.json.tmp')
+        try:
+            tmp_path.write_bytes(_json_dumps(new_mcp_config))
+            os.chmod(tmp_path, original_mode)
+            os.replace(tmp_path, mcp_json_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
         
         # Verificar el resultado
         remaining_entries = list(new_mcp_config.get("mcpServers", {}).keys())
@@ -314,16 +282,28 @@ def remove_chroma_from_mcp_json(mcp_json_path: Path) -> bool:
         print(traceback.format_exc(), file=sys.stderr)
         return False
 
-def remove_cursor_rules(project_path: Path) -> bool:
+def remove_cursor_rules(project_path: Path, dry_run: bool = False) -> bool:
     """Elimina las reglas de Cursor creadas por generate_cursor_rules."""
     rules_dir = project_path / ".cursor" / "rules"
     
-    if not rules_dir.exists():
+    # Un único listado del directorio: evita un stat() por regla candidata y
+    # sirve también para saber si el directorio quedará vacío (DirEntry.is_file()
+    # usa el tipo cacheado de la entrada, sin stat() salvo para symlinks)
+    present = {}
+    has_other_entries = False
+    try:
+        with os.scandir(rules_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    present[entry.name] = entry.path
+                else:
+                    has_other_entries = True
+    except FileNotFoundError:
         print(f"ℹ️  El directorio {rules_dir} no existe, omitiendo...")
         return True
     
     # Reglas que se crean con generate_cursor_rules (sin _optimized)
-    rules_to_delete = [
+    rules_to_delete = {
         "main_memory_rule.mdc",      # De main_memory_rule_optimized.mdc
         "auto_log_chat.mdc",         # De auto_log_chat_optimized.mdc
         "workflow.mdc",              # De workflow_optimized.mdc
@@ -332,44 +312,64 @@ def remove_cursor_rules(project_path: Path) -> bool:
         "validation_evidence.mdc",
         "debug_assist.mdc",
         "daily_workflow.mdc",
-    ]
+    }
     
-    deleted_count = 0
-    for rule_name in rules_to_delete:
-        rule_file = rules_dir / rule_name
-        if rule_file.exists():
-            try:
-                rule_file.unlink()
-                print(f"✅ Regla eliminada: {rule_name}")
-                deleted_count += 1
-            except Exception as e:
-                print(f"⚠️  Error al eliminar {rule_name}: {e}")
+    deleted = set()
+    for rule_name in sorted(rules_to_delete & present.keys()):
+        if dry_run:
+            print(f"🔎 [dry-run] Se eliminaría la regla: {rule_name}")
+            deleted.add(rule_name)
+            continue
+        try:
+            os.unlink(present[rule_name])
+            print(f"✅ Regla eliminada: {rule_name}")
+            deleted.add(rule_name)
+        except Exception as e:
+            print(f"⚠️  Error al eliminar {rule_name}: {e}")
     
     # Si el directorio queda vacío (excepto reglas específicas del proyecto), eliminarlo
-    if rules_dir.exists():
-        remaining_files = [f for f in rules_dir.iterdir() if f.is_file()]
-        if not remaining_files:
-            try:
-                rules_dir.rmdir()
-                print(f"✅ Directorio {rules_dir} eliminado (estaba vacío)")
-            except Exception as e:
-                print(f"⚠️  No se pudo eliminar el directorio {rules_dir}: {e}")
+    # Se reutiliza el listado inicial en lugar de volver a recorrer el directorio;
+    # con subdirectorios dentro ni se intenta el rmdir
+    if not has_other_entries and not (present.keys() - deleted):
+        if dry_run:
+            print(f"🔎 [dry-run] Se eliminaría el directorio {rules_dir} (quedaría vacío)")
+            return True
+        try:
+            os.rmdir(rules_dir)
+            print(f"✅ Directorio {rules_dir} eliminado (estaba vacío)")
+        except Exception as e:
+            print(f"⚠️  No se pudo eliminar el directorio {rules_dir}: {e}")
     
-    print(f"✅ {deleted_count} reglas eliminadas.")
+    if not dry_run:
+        print(f"✅ {len(deleted)} reglas eliminadas.")
     return True
 
-def remove_git_hook(project_path: Path) -> bool:
+# Marcadores que identifican el hook generado por setup-git-hook
+HOOK_MARKERS = (b"Indexing changed files", b"chroma-mcp-client", b"chroma_mcp_client")
+
+def _is_chroma_hook(content: bytes) -> bool:
+    """Indica si el contenido del hook contiene alguno de los marcadores de setup-git-hook."""
+    return any(marker in content for marker in HOOK_MARKERS)
+
+def remove_git_hook(project_path: Path, dry_run: bool = False) -> bool:
     """Elimina el hook post-commit de Git."""
     hook_path = project_path / ".git" / "hooks" / "post-commit"
     
-    if not hook_path.exists():
+    if not os.path.exists(hook_path):
         print(f"ℹ️  El hook {hook_path} no existe, omitiendo...")
         return True
     
     try:
         # Verificar que es el hook que creamos (contiene "chroma-mcp-client" o "Indexing changed files")
-        hook_content = hook_path.read_text(encoding='utf-8')
-        if "Indexing changed files" in hook_content or "chroma-mcp-client" in hook_content or "chroma_mcp_client" in hook_content:
+        # Los hooks suelen ocupar menos de 1 KiB: leer solo el inicio y el resto solo si hace falta
+        with open(hook_path, 'rb') as f:
+            hook_content = f.read(4096)
+            if not _is_chroma_hook(hook_content):
+                hook_content += f.read()
+        if _is_chroma_hook(hook_content):
+            if dry_run:
+                print(f"🔎 [dry-run] Se eliminaría el hook: {hook_path}")
+                return True
             hook_path.unlink()
             print(f"✅ Hook eliminado: {hook_path}")
             return True
@@ -380,6 +380,14 @@ def remove_git_hook(project_path: Path) -> bool:
         print(f"❌ Error al eliminar hook {hook_path}: {e}", file=sys.stderr)
         return False
 
+def _has_mdc_files(rules_dir: str) -> bool:
+    """Indica si quedan archivos .mdc en el directorio de reglas."""
+    try:
+        with os.scandir(rules_dir) as it:
+            return any(entry.name.endswith(".mdc") for entry in it)
+    except OSError:
+        return False
+
 def main():
     """Función principal."""
     parser = argparse.ArgumentParser(
@@ -396,6 +404,16 @@ def main():
         action="store_true",
         help="No pedir confirmación antes de eliminar"
     )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Al borrar colecciones, mostrar solo el total y no el detalle por colección"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Mostrar lo que se eliminaría sin modificar nada ni conectar a ChromaDB"
+    )
     
     args = parser.parse_args()
     
@@ -411,7 +429,7 @@ def main():
     # Leer mcp.json
     mcp_json_path = project_path / ".cursor" / "mcp.json"
     print(f"📖 Leyendo configuración desde {mcp_json_path}...")
-    mcp_config = read_mcp_json(mcp_json_path)
+    mcp_config = read_mcp_json(mcp_json_path, required=False)
     
     if not mcp_config:
         print("⚠️  No se encontró configuración válida en mcp.json.")
@@ -434,6 +452,9 @@ def main():
             print("💡 No se podrán borrar las colecciones de ChromaDB.")
             tenant = None
     
+    # Calcular una sola vez si el mcp.json tiene entrada 'chroma' (se reutiliza en el resumen final)
+    had_chroma_entry = "chroma" in mcp_config.get("mcpServers", {}) if mcp_config else False
+    
     # Mostrar resumen de lo que se va a eliminar
     print("\n" + "=" * 60)
     print("📋 Resumen de elementos a eliminar:")
@@ -443,22 +464,18 @@ def main():
     
     if tenant:
         items_to_delete.append(f"  - Colecciones de ChromaDB (tenant: {tenant})")
-        items_to_delete.append("    * codebase_v1")
-        items_to_delete.append("    * chat_history_v1")
-        items_to_delete.append("    * derived_learnings_v1")
-        items_to_delete.append("    * thinking_sessions_v1")
-        items_to_delete.append("    * validation_evidence_v1")
-        items_to_delete.append("    * test_results_v1")
-    
-    if mcp_config and "mcpServers" in mcp_config and "chroma" in mcp_config["mcpServers"]:
+        items_to_delete.extend(f"    * {name}" for name in COLLECTIONS_TO_DELETE)
+    
+    if had_chroma_entry:
         items_to_delete.append(f"  - Entrada 'chroma' en {mcp_json_path}")
     
-    rules_dir = project_path / ".cursor" / "rules"
-    if rules_dir.exists():
+    # Rutas como str: os.path evita construir objetos Path solo para comprobar si existen
+    rules_dir = os.path.join(project_path, ".cursor", "rules")
+    if os.path.exists(rules_dir):
         items_to_delete.append(f"  - Reglas de Cursor en {rules_dir}")
     
-    hook_path = project_path / ".git" / "hooks" / "post-commit"
-    if hook_path.exists():
+    hook_path = os.path.join(project_path, ".git", "hooks", "post-commit")
+    if os.path.exists(hook_path):
         items_to_delete.append(f"  - Hook de Git en {hook_path}")
     
     if not items_to_delete:
@@ -471,8 +488,8 @@ def main():
     
     print("\n" + "=" * 60)
     
-    # Pedir confirmación
-    if not args.force:
+    # Pedir confirmación (en dry-run no se modifica nada)
+    if not args.force and not args.dry_run:
         try:
             response = input("\n⚠️  ¿Estás seguro de que deseas eliminar todos estos elementos? (s/N): ").strip().lower()
         except UnicodeError as e:
@@ -488,35 +505,37 @@ def main():
     success = True
     
     # 1. Borrar colecciones de ChromaDB
-    if tenant:
+    if tenant and args.dry_run:
+        # Sin importar chromadb ni conectar: solo enumerar lo que se borraría
         print("=" * 60)
         print("1️⃣  Borrando colecciones de ChromaDB...")
         print("=" * 60)
-        if not delete_collections(tenant, env_vars, chroma_mcp_server_root, project_path):
+        for name in COLLECTIONS_TO_DELETE:
+            print(f"🔎 [dry-run] Se borraría la colección '{name}' (tenant: {tenant})")
+    elif tenant:
+        print("=" * 60)
+        print("1️⃣  Borrando colecciones de ChromaDB...")
+        print("=" * 60)
+        if not delete_collections(tenant, env_vars, chroma_mcp_server_root, project_path, quiet=args.quiet):
             success = False
     else:
         print("⏭️  Omitiendo borrado de colecciones (no hay tenant configurado)")
     
-    # 2. Eliminar entrada chroma del mcp.json
-    print("\n" + "=" * 60)
-    print("2️⃣  Eliminando entrada 'chroma' del mcp.json...")
-    print("=" * 60)
-    if not remove_chroma_from_mcp_json(mcp_json_path):
-        success = False
-    
-    # 3. Eliminar reglas de Cursor
-    print("\n" + "=" * 60)
-    print("3️⃣  Eliminando reglas de Cursor...")
-    print("=" * 60)
-    if not remove_cursor_rules(project_path):
+    # 2-4. mcp.json, reglas de Cursor y hook de Git tocan rutas distintas:
+    # se ejecutan en paralelo una vez borradas las colecciones
+    mcp_entry_removed, rules_removed, hook_removed = run_steps_concurrently([
+        ("2️⃣  Eliminando entrada 'chroma' del mcp.json...", functools.partial(remove_chroma_from_mcp_json, mcp_json_path, dry_run=args.dry_run)),
+        ("3️⃣  Eliminando reglas de Cursor...", functools.partial(remove_cursor_rules, project_path, dry_run=args.dry_run)),
+        ("4️⃣  Eliminando hook de Git...", functools.partial(remove_git_hook, project_path, dry_run=args.dry_run)),
+    ])
+    if not (mcp_entry_removed and rules_removed and hook_removed):
         success = False
     
-    # 4. Eliminar hook de Git
-    print("\n" + "=" * 60)
-    print("4️⃣  Eliminando hook de Git...")
-    print("=" * 60)
-    if not remove_git_hook(project_path):
-        success = False
+    if args.dry_run:
+        print("\n" + "=" * 60)
+        print("🔎 Simulación completada: no se modificó nada.")
+        print("=" * 60)
+        return 0 if success else 1
     
     print("\n" + "=" * 60)
     if success:
@@ -529,9 +548,12 @@ def main():
     print(f"   - Proyecto: {project_path}")
     if tenant:
         print(f"   - Tenant: {tenant}")
-    print(f"   - Configuración MCP: {'Eliminada' if not (mcp_json_path.exists() and read_mcp_json(mcp_json_path).get('mcpServers', {}).get('chroma')) else 'Parcial'}")
-    print(f"   - Reglas de Cursor: {'Eliminadas' if not (project_path / '.cursor' / 'rules').exists() or not any((project_path / '.cursor' / 'rules').glob('*.mdc')) else 'Parcial'}")
-    print(f"   - Hook de Git: {'Eliminado' if not (project_path / '.git' / 'hooks' / 'post-commit').exists() else 'Parcial'}")
+    if had_chroma_entry:
+        print(f"   - Configuración MCP: {'Eliminada' if mcp_entry_removed else 'Parcial'}")
+    else:
+        print("   - Configuración MCP: Sin entrada 'chroma'")
+    print(f"   - Reglas de Cursor: {'Parcial' if _has_mdc_files(rules_dir) else 'Eliminadas'}")
+    print(f"   - Hook de Git: {'Parcial' if os.path.exists(hook_path) else 'Eliminado'}")
     
     return 0 if success else 1
 
@@ -8,100 +8,61 @@ import sys
 import argparse
 from pathlib import Path
 from typing import Optional
-import shutil
+
+# Utilidades compartidas con el resto de scripts de scripts/propios
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import get_chroma_mcp_server_root, _canonicalize, _require_dir, _prompt_dir, DirError, _utf8_setup
 
 # Configurar codificación UTF-8 para stdin/stdout/stderr
-if sys.version_info >= (3, 7):
-    try:
-        sys.stdin.reconfigure(encoding='utf-8')
-        sys.stdout.reconfigure(encoding='utf-8')
-        sys.stderr.reconfigure(encoding='utf-8')
-    except (AttributeError, ValueError):
-        os.environ['PYTHONIOENCODING'] = 'utf-8'
-else:
-    os.environ['PYTHONIOENCODING'] = 'utf-8'
+_utf8_setup()
 
-def get_chroma_mcp_server_root() -> Path:
-    """
-    Obtiene la raíz del proyecto chroma_mcp_server buscando marcadores como
-    pyproject.toml o Makefile, empezando desde el directorio del script.
-    """
-    # Obtener el directorio donde está este script
-    script_dir = Path(__file__).parent.resolve()
-    
-    # Buscar hacia arriba desde el script hasta encontrar la raíz del proyecto
-    current = script_dir
-    markers = ["pyproject.toml", "Makefile", ".git"]
-    
-    # Buscar hasta 5 niveles arriba (por si acaso)
-    for _ in range(5):
-        # Verificar si encontramos algún marcador
-        for marker in markers:
-            if (current / marker).exists():
-                return current.resolve()
-        # Si no encontramos, subir un nivel
-        parent = current.parent
-        if parent == current:  # Llegamos a la raíz del sistema
-            break
-        current = parent
-    
-    # Fallback: usar el cálculo relativo (dos niveles arriba desde scripts/propios)
-    fallback_root = script_dir.parent.parent
-    return fallback_root.resolve()
+# Directorio donde está este script (un solo resolve() para todo el módulo)
+SCRIPT_DIR = Path(__file__).resolve().parent
 
 def get_project_path(project_path_arg: Optional[str] = None) -> Path:
     """Obtiene la ruta del proyecto destino, ya sea desde argumento o preguntando al usuario."""
     if project_path_arg:
-        project_path = os.path.expanduser(project_path_arg)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"❌ Error: La ruta {project_path} no existe.", file=sys.stderr)
-            sys.exit(1)
-        
-        if not project_path.is_dir():
-            print(f"❌ Error: {project_path} no es un directorio.", file=sys.stderr)
+        # Un solo stat() para comprobar que existe y que es un directorio
+        try:
+            return _require_dir(_canonicalize(project_path_arg))
+        except DirError as e:
+            print(f"❌ Error: {e}.", file=sys.stderr)
             sys.exit(1)
-        
-        return project_path
     
-    # Si no se pasó argumento, preguntar interactivamente
+    # Si no se pasó argumento, preguntar interactivamente hasta obtener una ruta válida
     while True:
         try:
-            project_path = input("📁 Ingresa la ruta del proyecto donde quieres generar las reglas de Cursor: ").strip()
+            return _require_dir(_prompt_dir("📁 Ingresa la ruta del proyecto donde quieres generar las reglas de Cursor: "))
+        except DirError as e:
+            print(f"⚠️  {e}. Intenta de nuevo.")
         except UnicodeError as e:
             print(f"⚠️  Error de codificación al leer la entrada: {e}", file=sys.stderr)
             print("💡 Intenta ejecutar el script con: PYTHONIOENCODING=utf-8 python3 generate_cursor_rules.py", file=sys.stderr)
             sys.exit(1)
-        
-        if not project_path:
-            print("⚠️  La ruta no puede estar vacía. Intenta de nuevo.")
-            continue
-        
-        # Expandir ~ y variables de entorno
-        project_path = os.path.expanduser(project_path)
-        project_path = os.path.expandvars(project_path)
-        
-        # Convertir a Path y resolver
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"⚠️  La ruta {project_path} no existe. Intenta de nuevo.")
-            continue
-        
-        if not project_path.is_dir():
-            print(f"⚠️  {project_path} no es un directorio. Intenta de nuevo.")
-            continue
-        
-        return project_path
 
-# Obtener el directorio donde está este script
-SCRIPT_DIR = Path(__file__).parent.resolve()
 # Obtener la raíz del proyecto chroma_mcp_server dinámicamente (para encontrar cursor-rules)
 CHROMA_MCP_SERVER_ROOT = get_chroma_mcp_server_root()
 CURSOR_RULES_SOURCE = SCRIPT_DIR / "cursor-rules"
 
+def _fastcopy(src: Path, dst: Path) -> None:
+    """
+    Copia el contenido de src en dst sin metadatos (las reglas no necesitan el
+    mtime ni los permisos del origen). En Linux usa os.copy_file_range, que copia
+    dentro del kernel (o con reflink en sistemas de archivos CoW); si no está
+    disponible o falla (EXDEV, ENOSYS...), recurre a shutil.copyfile.
+    """
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except (AttributeError, OSError):
+        import shutil
+        shutil.copyfile(src, dst)
+
 # Colecciones de ChromaDB según reset_collections.py
 COLLECTIONS = [
     "codebase_v1",
@@ -112,7 +73,21 @@ COLLECTIONS = [
     "test_results_v1"
 ]
 
-def main():
+# Solo se generan las reglas optimizadas (que usan los nombres correctos de colecciones).
+# Las reglas originales tienen nombres de colecciones incorrectos (symfony_codebase, etc.)
+# y las específicas de un proyecto (chroma-mcp.mdc, autobiz.mdc) no se generan.
+OPTIMIZED_RULES = (
+    "main_memory_rule_optimized.mdc",
+    "auto_log_chat_optimized.mdc",
+    "workflow_optimized.mdc",
+    "thinking_sessions.mdc",        # Regla específica para Thinking Sessions
+    "derived_learnings.mdc",        # Regla específica para Derived Learnings workflow
+    "validation_evidence.mdc",      # Regla específica para Validation Evidence
+    "debug_assist.mdc",             # Regla específica para Debug Assist (búsqueda proactiva de soluciones)
+    "daily_workflow.mdc",           # Regla específica para Daily Workflow Integration
+)
+
+def main(argv: Optional[list[str]] = None):
     """Genera las reglas de Cursor en .cursor/rules del proyecto especificado."""
     parser = argparse.ArgumentParser(
         description="Genera reglas de Cursor en .cursor/rules basadas en las colecciones de ChromaDB.",
@@ -124,7 +99,7 @@ def main():
         help="Ruta del proyecto donde generar las reglas (si no se proporciona, se pregunta interactivamente)"
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     print("🔄 Generador de Reglas de Cursor para ChromaDB\n")
     
@@ -144,43 +119,18 @@ def main():
     cursor_rules_target.mkdir(parents=True, exist_ok=True)
     print(f"📁 Directorio de destino: {cursor_rules_target}\n")
     
-    # Reglas específicas del proyecto que NO deben ser generadas por el script
-    EXCLUDED_RULES = [
-        "chroma-mcp.mdc",  # Regla específica del proyecto
-        "autobiz.mdc",     # Regla específica del AutobizBundle
-    ]
-    
-    # Solo generar reglas optimizadas (que usan los nombres correctos de colecciones)
-    # Las reglas originales tienen nombres de colecciones incorrectos (symfony_codebase, etc.)
-    OPTIMIZED_RULES = [
-        "main_memory_rule_optimized.mdc",
-        "auto_log_chat_optimized.mdc",
-        "workflow_optimized.mdc",
-        "thinking_sessions.mdc",        # Regla específica para Thinking Sessions
-        "derived_learnings.mdc",        # Regla específica para Derived Learnings workflow
-        "validation_evidence.mdc",       # Regla específica para Validation Evidence
-        "debug_assist.mdc",             # Regla específica para Debug Assist (búsqueda proactiva de soluciones)
-        "daily_workflow.mdc",           # Regla específica para Daily Workflow Integration
-    ]
-    
-    # Copiar solo las reglas optimizadas a .cursor/rules (renombradas sin _optimized)
+    # Copiar solo las reglas optimizadas a .cursor/rules (renombradas sin _optimized).
+    # Los nombres se conocen de antemano: se abren directamente sin listar el directorio
     copied_count = 0
-    for rule_file in CURSOR_RULES_SOURCE.glob("*.mdc"):
-        # Saltar reglas excluidas
-        if rule_file.name in EXCLUDED_RULES:
-            print(f"⏭️  Omitida (específica del proyecto): {rule_file.name}")
-            continue
-        
-        # Solo procesar reglas optimizadas
-        if rule_file.name not in OPTIMIZED_RULES:
-            print(f"⏭️  Omitida (regla original con nombres incorrectos): {rule_file.name}")
-            continue
-        
+    for rule_name in OPTIMIZED_RULES:
         # Renombrar quitando _optimized del nombre
-        target_name = rule_file.name.replace("_optimized", "")
-        target_file = cursor_rules_target / target_name
-        shutil.copy2(rule_file, target_file)
-        print(f"✅ Copiada: {rule_file.name} → {target_name}")
+        target_name = rule_name.replace("_optimized", "")
+        try:
+            _fastcopy(CURSOR_RULES_SOURCE / rule_name, cursor_rules_target / target_name)
+        except FileNotFoundError:
+            print(f"⚠️  No se encontró la regla {rule_name} en {CURSOR_RULES_SOURCE}, omitiendo")
+            continue
+        print(f"✅ Copiada: {rule_name} → {target_name}")
         copied_count += 1
     
     print(f"\n✅ Proceso completado. {copied_count} reglas copiadas a {cursor_rules_target}")
@@ -7,44 +7,23 @@ y ejecuta la indexación excluyendo archivos según .gitignore y .git/info/exclu
 """
 import os
 import sys
-import json
 import argparse
 import subprocess
 import fnmatch
+import re
+import queue
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Set, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Set, Optional, Tuple
 
-# Configurar codificación UTF-8 para stdin/stdout/stderr
-if sys.version_info >= (3, 7):
-    try:
-        sys.stdin.reconfigure(encoding='utf-8')
-        sys.stdout.reconfigure(encoding='utf-8')
-        sys.stderr.reconfigure(encoding='utf-8')
-    except (AttributeError, ValueError):
-        os.environ['PYTHONIOENCODING'] = 'utf-8'
-else:
-    os.environ['PYTHONIOENCODING'] = 'utf-8'
+# Utilidades compartidas con el resto de scripts de scripts/propios
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import get_chroma_mcp_server_root, _canonicalize, read_mcp_json, _require_dir, _prompt_dir, DirError, get_chroma_env_vars_from_mcp_json, _utf8_setup
 
-def get_chroma_mcp_server_root() -> Path:
-    """
-    Obtiene la raíz del proyecto chroma_mcp_server buscando marcadores como
-    pyproject.toml o Makefile, empezando desde el directorio del script.
-    """
-    script_dir = Path(__file__).parent.resolve()
-    current = script_dir
-    markers = ["pyproject.toml", "Makefile", ".git"]
-    
-    for _ in range(5):
-        for marker in markers:
-            if (current / marker).exists():
-                return current.resolve()
-        parent = current.parent
-        if parent == current:
-            break
-        current = parent
-    
-    fallback_root = script_dir.parent.parent
-    return fallback_root.resolve()
+# Configurar codificación UTF-8 para stdin/stdout/stderr
+_utf8_setup()
 
 # Obtener la raíz del proyecto chroma_mcp_server dinámicamente
 CHROMA_MCP_SERVER_ROOT = get_chroma_mcp_server_root()
@@ -52,63 +31,23 @@ CHROMA_MCP_SERVER_ROOT = get_chroma_mcp_server_root()
 def get_project_path(project_path_arg: Optional[str] = None) -> Path:
     """Obtiene la ruta del proyecto destino, ya sea desde argumento o preguntando al usuario."""
     if project_path_arg:
-        project_path = os.path.expanduser(project_path_arg)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"❌ Error: La ruta {project_path} no existe.", file=sys.stderr)
-            sys.exit(1)
-        
-        if not project_path.is_dir():
-            print(f"❌ Error: {project_path} no es un directorio.", file=sys.stderr)
+        # Un solo stat() para comprobar que existe y que es un directorio
+        try:
+            return _require_dir(_canonicalize(project_path_arg))
+        except DirError as e:
+            print(f"❌ Error: {e}.", file=sys.stderr)
             sys.exit(1)
-        
-        return project_path
     
-    # Si no se pasó argumento, preguntar interactivamente
+    # Si no se pasó argumento, preguntar interactivamente hasta obtener una ruta válida
     while True:
         try:
-            project_path = input("📁 Ingresa la ruta del proyecto que quieres indexar: ").strip()
+            return _require_dir(_prompt_dir("📁 Ingresa la ruta del proyecto que quieres indexar: "))
+        except DirError as e:
+            print(f"⚠️  {e}. Intenta de nuevo.")
         except UnicodeError as e:
             print(f"⚠️  Error de codificación al leer la entrada: {e}", file=sys.stderr)
             print("💡 Intenta ejecutar el script con: PYTHONIOENCODING=utf-8 python3 index-project.py", file=sys.stderr)
             sys.exit(1)
-        
-        if not project_path:
-            print("⚠️  La ruta no puede estar vacía. Intenta de nuevo.")
-            continue
-        
-        project_path = os.path.expanduser(project_path)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"⚠️  La ruta {project_path} no existe. Intenta de nuevo.")
-            continue
-        
-        if not project_path.is_dir():
-            print(f"⚠️  {project_path} no es un directorio. Intenta de nuevo.")
-            continue
-        
-        return project_path
-
-def read_mcp_json(mcp_json_path: Path) -> Dict[str, Any]:
-    """Lee el archivo mcp.json y retorna su contenido."""
-    if not mcp_json_path.exists():
-        print(f"❌ Error: No se encontró el archivo {mcp_json_path}", file=sys.stderr)
-        sys.exit(1)
-    
-    try:
-        with open(mcp_json_path, 'r') as f:
-            mcp_config = json.load(f)
-        return mcp_config
-    except json.JSONDecodeError as e:
-        print(f"❌ Error al leer {mcp_json_path}: {e}", file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        print(f"❌ Error al leer {mcp_json_path}: {e}", file=sys.stderr)
-        sys.exit(1)
 
 def get_chroma_tenant_from_mcp_json(mcp_config: Dict[str, Any]) -> str:
     """Extrae el valor de CHROMA_TENANT del archivo mcp.json."""
@@ -122,133 +61,328 @@ def get_chroma_tenant_from_mcp_json(mcp_config: Dict[str, Any]) -> str:
     
     return tenant
 
-def read_git_exclude_patterns(project_root: Path) -> List[str]:
-    """Lee los patrones de exclusión de .git/info/exclude."""
-    exclude_file = project_root / ".git" / "info" / "exclude"
+def read_pattern_file(pattern_file: Path) -> List[str]:
+    """Lee los patrones de un archivo con formato gitignore (sin comentarios ni líneas vacías)."""
     patterns = []
     
-    if exclude_file.exists():
+    if pattern_file.exists():
         try:
-            with open(exclude_file, 'r', encoding='utf-8') as f:
+            with open(pattern_file, 'r', encoding='utf-8') as f:
                 for line in f:
                     line = line.strip()
                     # Ignorar comentarios y líneas vacías
                     if line and not line.startswith('#'):
                         patterns.append(line)
         except Exception as e:
-            print(f"⚠️  Advertencia: No se pudo leer {exclude_file}: {e}", file=sys.stderr)
+            print(f"⚠️  Advertencia: No se pudo leer {pattern_file}: {e}", file=sys.stderr)
     
     return patterns
 
-def matches_pattern(file_path: Path, pattern: str, project_root: Path) -> bool:
+def read_git_exclude_patterns(project_root: Path) -> List[str]:
+    """Lee los patrones de exclusión de .git/info/exclude."""
+    return read_pattern_file(project_root / ".git" / "info" / "exclude")
+
+def _translate_exclude_pattern(pattern: str) -> str:
     """
-    Verifica si un archivo coincide con un patrón de gitignore/exclude.
-    Soporta patrones básicos de gitignore.
+    Traduce un patrón de gitignore/exclude a una expresión regular sobre la ruta
+    relativa (con '/') de un archivo. Soporta patrones básicos de gitignore.
     """
-    # Obtener la ruta relativa desde la raíz del proyecto
-    try:
-        rel_path = file_path.relative_to(project_root)
-        rel_path_str = str(rel_path)
-    except ValueError:
-        # Si el archivo no está dentro del proyecto, no coincide
-        return False
-    
     # Normalizar separadores de ruta
-    rel_path_str = rel_path_str.replace('\\', '/')
     pattern = pattern.replace('\\', '/')
     
-    # Si el patrón termina con /, solo coincide con directorios
+    # Si el patrón termina con /, solo coincide con directorios: excluye lo que hay dentro
     if pattern.endswith('/'):
-        if not file_path.is_dir():
-            return False
-        pattern = pattern[:-1]
+        pattern = pattern[:-1] + '/*'
     
     # Si el patrón comienza con /, es relativo a la raíz
     if pattern.startswith('/'):
         pattern = pattern[1:]
-        return fnmatch.fnmatch(rel_path_str, pattern) or fnmatch.fnmatch(rel_path_str, pattern + '/*')
+        return f"(?:{fnmatch.translate(pattern)})|(?:{fnmatch.translate(pattern + '/*')})"
     
     # Si el patrón contiene **, expandirlo
     if '**' in pattern:
         # Convertir ** a * para fnmatch (simplificado)
         pattern = pattern.replace('**', '*')
     
-    # Verificar coincidencia directa o en cualquier subdirectorio
-    if fnmatch.fnmatch(rel_path_str, pattern):
-        return True
+    # Coincidencia directa o en cualquier subdirectorio
+    return f"(?:.*/)?(?:{fnmatch.translate(pattern)})"
+
+def compile_exclude_patterns(exclude_patterns: List[str]) -> Optional["re.Pattern[str]"]:
+    """Compila todos los patrones de exclusión en una única expresión regular."""
+    if not exclude_patterns:
+        return None
+    return re.compile('|'.join(f"(?:{_translate_exclude_pattern(p)})" for p in exclude_patterns))
+
+def _translate_exclude_dir_pattern(pattern: str) -> str:
+    """
+    Retorna la expresión regular que identifica, por su ruta relativa, los
+    directorios cuyo contenido excluye el patrón. Como en gitignore, un patrón
+    también excluye todo lo que hay dentro de un directorio que coincida con él:
+    'dir/' y 'dir/*' excluyen el directorio, '/dir' solo en la raíz, y un patrón
+    sin '/' ('node_modules', '.venv', '*.egg-info') ese nombre a cualquier profundidad.
+    """
+    pattern = pattern.replace('\\', '/')
+    if pattern.endswith('/'):
+        pattern = pattern[:-1]
+    elif pattern.endswith('/*'):
+        pattern = pattern[:-2]
     
-    # Verificar si coincide en algún nivel del path
-    path_parts = rel_path_str.split('/')
-    for i in range(len(path_parts)):
-        sub_path = '/'.join(path_parts[i:])
-        if fnmatch.fnmatch(sub_path, pattern):
-            return True
+    if pattern.startswith('/'):
+        return fnmatch.translate(pattern[1:])
     
-    return False
+    if '**' in pattern:
+        pattern = pattern.replace('**', '*')
+    return f"(?:.*/)?(?:{fnmatch.translate(pattern)})"
+
+def split_literal_exclude_patterns(exclude_patterns: List[str]) -> Tuple[Set[str], Tuple[str, ...], Tuple[str, ...], List[str]]:
+    """
+    Separa los patrones sin comodines ('*', '?', '[') del resto. Los literales se
+    comparan con ==, startswith y endswith en lugar de pasar por la expresión
+    regular. Retorna (rutas exactas, prefijos, sufijos, patrones con comodines).
+    Los literales de directorio ('dir/') no se retornan: los cubre
+    compile_exclude_dir_patterns.
+    """
+    exact: Set[str] = set()
+    prefixes: Set[str] = set()
+    suffixes: Set[str] = set()
+    glob_patterns: List[str] = []
+    for pattern in exclude_patterns:
+        literal = pattern.replace('\\', '/')
+        if any(c in literal for c in '*?['):
+            glob_patterns.append(pattern)
+        elif literal.startswith('/'):
+            # '/ruta': la ruta misma o cualquier cosa dentro de ella
+            literal = literal[1:]
+            if literal.endswith('/'):
+                prefixes.add(literal)
+            else:
+                exact.add(literal)
+                prefixes.add(literal + '/')
+        elif not literal.endswith('/'):
+            # 'nombre': coincide en la raíz o en cualquier subdirectorio
+            exact.add(literal)
+            suffixes.add('/' + literal)
+    return exact, tuple(prefixes), tuple(suffixes), glob_patterns
 
-def filter_files_by_exclude(files: List[Path], project_root: Path, exclude_patterns: List[str]) -> List[Path]:
-    """Filtra archivos según los patrones de exclusión."""
-    filtered = []
+def compile_exclude_dir_patterns(exclude_patterns: List[str]) -> Optional["re.Pattern[str]"]:
+    """Compila en una única expresión regular los patrones que excluyen directorios enteros."""
+    if not exclude_patterns:
+        return None
+    return re.compile('|'.join(f"(?:{_translate_exclude_dir_pattern(p)})" for p in exclude_patterns))
+
+def filter_files_by_exclude(files: Iterable[Path], project_root: Path, exclude_patterns: List[str]) -> Iterator[Path]:
+    """Filtra archivos según los patrones de exclusión (a medida que llegan)."""
+    if not exclude_patterns:
+        yield from files
+        return
+    # La mayoría de patrones son nombres literales (.venv, build, /dist): se comprueban
+    # con comparaciones de cadenas y solo los que tienen comodines van a la regex
+    exact, prefixes, suffixes, glob_patterns = split_literal_exclude_patterns(exclude_patterns)
+    excluded_re = compile_exclude_patterns(glob_patterns)
+    excluded_dir_re = compile_exclude_dir_patterns(exclude_patterns)
+    
+    # Cada directorio se evalúa una sola vez (junto con sus padres): los archivos
+    # de un directorio excluido (p. ej. node_modules/) se descartan sin mirarlos uno a uno
+    dir_excluded: Dict[str, bool] = {"": False}
+    
+    def _is_dir_excluded(rel_dir: str) -> bool:
+        excluded = dir_excluded.get(rel_dir)
+        if excluded is None:
+            parent = rel_dir.rpartition('/')[0]
+            excluded = _is_dir_excluded(parent) or bool(excluded_dir_re.match(rel_dir))
+            dir_excluded[rel_dir] = excluded
+        return excluded
+    
+    # Como mucho una búsqueda de la regex por archivo en lugar de varios fnmatch por patrón
+    root_prefix = str(project_root) + os.sep
     for file_path in files:
-        should_exclude = False
-        for pattern in exclude_patterns:
-            if matches_pattern(file_path, pattern, project_root):
-                should_exclude = True
-                break
-        if not should_exclude:
-            filtered.append(file_path)
-    return filtered
+        file_str = str(file_path)
+        if not file_str.startswith(root_prefix):
+            # Si el archivo no está dentro del proyecto, no coincide
+            yield file_path
+            continue
+        rel_path_str = file_str[len(root_prefix):].replace('\\', '/')
+        if excluded_dir_re is not None and _is_dir_excluded(rel_path_str.rpartition('/')[0]):
+            continue
+        if (rel_path_str in exact or rel_path_str.startswith(prefixes)
+                or rel_path_str.endswith(suffixes)):
+            continue
+        if excluded_re is None or not excluded_re.match(rel_path_str):
+            yield file_path
 
-def get_all_files_in_project(project_root: Path) -> List[Path]:
+def walk_project_files(project_root: Path, exclude_patterns: List[str]) -> Iterator[Path]:
+    """
+    Recorre el proyecto con os.walk (basado en os.scandir) sin depender de git.
+    Los directorios excluidos se podan al vuelo: se quitan de `dirs` para que
+    os.walk no descienda en ellos.
+    """
+    excluded_dir_re = compile_exclude_dir_patterns(exclude_patterns)
+    prefix_len = len(str(project_root)) + len(os.sep)
+    
+    for root, dirs, files in os.walk(project_root, topdown=True):
+        rel_root = root[prefix_len:].replace(os.sep, '/')
+        dirs[:] = [
+            d for d in dirs
+            if d != ".git" and not (
+                excluded_dir_re is not None
+                and excluded_dir_re.match(f"{rel_root}/{d}" if rel_root else d)
+            )
+        ]
+        for name in files:
+            yield Path(root, name)
+
+def _is_outside_git_work_tree(project_root: Path) -> bool:
+    """Indica si git confirma que project_root no está dentro de un working tree."""
+    # LC_ALL=C: el mensaje de git se compara en inglés aunque la locale sea otra
+    result = subprocess.run(
+        ["git", "-C", str(project_root), "rev-parse", "--is-inside-work-tree"],
+        capture_output=True, encoding="utf-8", errors="replace", env={**os.environ, "LC_ALL": "C"},
+    )
+    if result.returncode == 0:
+        # "false" dentro de .git o de un repositorio bare
+        return result.stdout.strip() != "true"
+    return "not a git repository" in result.stderr
+
+def get_all_files_in_project(project_root: Path) -> Iterator[Path]:
     """
     Obtiene todos los archivos del proyecto usando git ls-files,
     que automáticamente respeta .gitignore.
+    
+    Es un generador: las rutas se producen a medida que git las emite, sin
+    cargar toda su salida en memoria. Si el proyecto no es un repositorio git
+    (o git no está instalado) se recorre el directorio aplicando el .gitignore
+    de la raíz.
     """
     try:
-        cmd = ["git", "-C", str(project_root), "ls-files", "-z"]
-        result = subprocess.run(cmd, capture_output=True, check=True, encoding="utf-8")
-        
-        files = []
-        for file_str in result.stdout.strip("\0").split("\0"):
-            if file_str:
-                file_path = project_root / file_str
-                if file_path.exists() and file_path.is_file():
-                    files.append(file_path)
+        # git ya confirma que son archivos rastreados: en lugar de hacer stat() a
+        # cada uno, se descartan los submódulos (modo 160000) con --stage y los
+        # archivos borrados del working tree con una segunda llamada --deleted
+        deleted_cmd = ["git", "-C", str(project_root), "ls-files", "-z", "--deleted"]
+        deleted_result = subprocess.run(deleted_cmd, capture_output=True, check=True, encoding="utf-8")
+        deleted = set(deleted_result.stdout.split("\0"))
         
-        return files
+        cmd = ["git", "-C", str(project_root), "ls-files", "-z", "--stage"]
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     except FileNotFoundError:
-        print("❌ Error: 'git' command not found. Ensure Git is installed and in PATH.", file=sys.stderr)
-        sys.exit(1)
+        reason = "'git' no está instalado"
     except subprocess.CalledProcessError as e:
-        print(f"❌ Error ejecutando 'git ls-files' en {project_root}: {e}", file=sys.stderr)
-        print(f"   stderr: {e.stderr}", file=sys.stderr)
+        # Solo se recorre el directorio si de verdad no es un repositorio: con
+        # cualquier otro fallo (safe.directory, índice corrupto...) se indexaría
+        # el árbol entero sin filtrar, así que se mantiene el error
+        if not _is_outside_git_work_tree(project_root):
+            print(f"❌ Error ejecutando 'git ls-files' en {project_root}: {e}", file=sys.stderr)
+            print(f"   stderr: {e.stderr}", file=sys.stderr)
+            sys.exit(1)
+        reason = "no es un repositorio git"
+    else:
+        reason = None
+    
+    if reason is not None:
+        print(f"⚠️  No se puede usar 'git ls-files' en {project_root} ({reason}); recorriendo el directorio...", file=sys.stderr)
+        # Las negaciones (!patrón) de .gitignore no están soportadas
+        gitignore_patterns = [p for p in read_pattern_file(project_root / ".gitignore") if not p.startswith('!')]
+        yield from filter_files_by_exclude(
+            walk_project_files(project_root, gitignore_patterns), project_root, gitignore_patterns
+        )
+        return
+    
+    seen = set()
+    buffer = b""
+    with proc:
+        # Leer la salida por bloques y procesar las entradas completas (separadas por NUL)
+        for chunk in iter(lambda: proc.stdout.read(65536), b""):
+            *entries, buffer = (buffer + chunk).split(b"\0")
+            for entry in entries:
+                # Formato: "<modo> <hash> <stage>\t<ruta>"
+                info, _, file_str = entry.decode("utf-8").partition("\t")
+                if info.startswith("160000") or file_str in deleted:
+                    continue
+                # Con conflictos de merge la misma ruta aparece en varios stages
+                if file_str in seen:
+                    continue
+                seen.add(file_str)
+                yield project_root / file_str
+        stderr = proc.stderr.read().decode("utf-8", errors="replace")
+    
+    if proc.returncode != 0:
+        print(f"❌ Error ejecutando 'git ls-files' en {project_root}: código de salida {proc.returncode}", file=sys.stderr)
+        print(f"   stderr: {stderr}", file=sys.stderr)
         sys.exit(1)
 
-def get_chroma_env_vars_from_mcp_json(mcp_config: Dict[str, Any]) -> Dict[str, str]:
-    """Extrae todas las variables de entorno relevantes del mcp.json."""
-    chroma_config = mcp_config.get("mcpServers", {}).get("chroma", {})
-    env_vars = chroma_config.get("env", {})
-    
-    # Variables relevantes para conectar a ChromaDB
-    relevant_vars = {
-        "CHROMA_CLIENT_TYPE": env_vars.get("CHROMA_CLIENT_TYPE"),
-        "CHROMA_HOST": env_vars.get("CHROMA_HOST"),
-        "CHROMA_PORT": env_vars.get("CHROMA_PORT"),
-        "CHROMA_SSL": env_vars.get("CHROMA_SSL"),
-        "CHROMA_API_KEY": env_vars.get("CHROMA_API_KEY"),
-        "CHROMA_TENANT": env_vars.get("CHROMA_TENANT"),
-        "CHROMA_DATABASE": env_vars.get("CHROMA_DATABASE"),
-        "CHROMA_DATA_DIR": env_vars.get("CHROMA_DATA_DIR"),
-        "CHROMA_EMBEDDING_FUNCTION": env_vars.get("CHROMA_EMBEDDING_FUNCTION"),
-        "OPENAI_API_KEY": env_vars.get("OPENAI_API_KEY"),
-    }
-    
-    return {k: v for k, v in relevant_vars.items() if v is not None}
+# Procesos 'index-stdin' simultáneos por defecto: cada uno es persistente y
+# carga su propia copia de chromadb y del modelo de embeddings, así que el valor
+# por defecto es bajo; --jobs permite subirlo
+DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# Segundos mínimos entre dos actualizaciones de la línea de progreso
+PROGRESS_INTERVAL = 0.5
+
+def _index_worker(paths: List[str], cmd: List[str], project_root: Path, env: Dict[str, str], results: "queue.Queue[Tuple[str, str]]") -> str:
+    """
+    Indexa paths con un único proceso 'index-stdin' persistente: escribe una ruta
+    por línea y lee una línea de estado por ruta, así Python, chromadb y la función
+    de embeddings se cargan una sola vez. Deja un (ruta, estado) en results por cada
+    ruta, también si el proceso falla, y retorna el stderr del proceso.
+    """
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                cwd=str(project_root),
+                env=env,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,  # A un archivo: un pipe sin leer podría bloquear al hijo
+                text=True,
+                encoding="utf-8",
+            )
+        except Exception as e:
+            for rel_path in paths:
+                results.put((rel_path, "error"))
+            return str(e)
+        
+        pending = iter(paths)
+        try:
+            for rel_path in pending:
+                if "\n" in rel_path or "\r" in rel_path:
+                    # El protocolo es de una ruta por línea: una ruta con saltos
+                    # de línea (git ls-files -z las admite) desincronizaría todas
+                    # las líneas de estado siguientes, así que no se envía
+                    results.put((rel_path, "error"))
+                    continue
+                try:
+                    proc.stdin.write(f"{rel_path}\n")
+                    proc.stdin.flush()
+                    status = proc.stdout.readline().split("\t", 1)[0]
+                except UnicodeEncodeError:
+                    # Nombre no representable en UTF-8: no llega a escribirse nada
+                    results.put((rel_path, "error"))
+                    continue
+                except OSError:
+                    status = ""
+                if not status:
+                    # El proceso terminó antes de tiempo: el resto de rutas fallan
+                    results.put((rel_path, "error"))
+                    break
+                results.put((rel_path, status))
+            for rel_path in pending:
+                results.put((rel_path, "error"))
+        finally:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            proc.wait()
+        
+        stderr_file.seek(0)
+        return stderr_file.read().decode("utf-8", errors="replace")
 
-def run_indexing(project_root: Path, mcp_config: Dict[str, Any]) -> int:
+def run_indexing(project_root: Path, mcp_config: Dict[str, Any], max_workers: int = DEFAULT_MAX_WORKERS) -> int:
     """
     Ejecuta el script de indexación usando chroma-mcp-client.
     Establece todas las variables de entorno del mcp.json antes de ejecutar.
+    Con exclusiones de .git/info/exclude los archivos se envían por stdin a
+    procesos 'index-stdin' persistentes, hasta max_workers a la vez.
     """
     # Extraer todas las variables de entorno del mcp.json
     env_vars = get_chroma_env_vars_from_mcp_json(mcp_config)
@@ -263,17 +397,28 @@ def run_indexing(project_root: Path, mcp_config: Dict[str, Any]) -> int:
             print(f"   - {key}: {value}")
     print()
     
-    # Obtener todos los archivos del proyecto (git ls-files ya respeta .gitignore)
-    print("📋 Obteniendo lista de archivos del proyecto...")
-    all_files_before_exclude = get_all_files_in_project(project_root)
-    print(f"   Encontrados {len(all_files_before_exclude)} archivos rastreados por git")
-    
     # Leer patrones de .git/info/exclude
     exclude_patterns = read_git_exclude_patterns(project_root)
-    all_files = all_files_before_exclude
+    
+    # Obtener todos los archivos del proyecto (git ls-files ya respeta .gitignore).
+    # Las exclusiones se aplican mientras git emite la lista: solo se guardan los
+    # archivos que quedan, y del resto solo se lleva la cuenta
+    print("📋 Obteniendo lista de archivos del proyecto...")
+    tracked_count = 0
+    
+    def _count_tracked(files: Iterable[Path]) -> Iterator[Path]:
+        nonlocal tracked_count
+        for file_path in files:
+            tracked_count += 1
+            yield file_path
+    
     if exclude_patterns:
         print(f"📋 Aplicando {len(exclude_patterns)} patrones de exclusión de .git/info/exclude...")
-        all_files = filter_files_by_exclude(all_files, project_root, exclude_patterns)
+    all_files = list(filter_files_by_exclude(
+        _count_tracked(get_all_files_in_project(project_root)), project_root, exclude_patterns
+    ))
+    print(f"   Encontrados {tracked_count} archivos rastreados por git")
+    if exclude_patterns:
         print(f"   Quedan {len(all_files)} archivos después de aplicar exclusiones")
     
     # Preparar el comando de indexación
@@ -291,40 +436,71 @@ def run_indexing(project_root: Path, mcp_config: Dict[str, Any]) -> int:
         env[key] = value
         print(f"🔧 Establecida variable de entorno: {key} (desde mcp.json del proyecto)")
     
-    # Si hay archivos excluidos por .git/info/exclude, necesitamos indexar archivo por archivo
+    # Si hay archivos excluidos por .git/info/exclude, necesitamos pasar la lista de archivos
     # en lugar de usar --all, ya que --all no respeta .git/info/exclude
-    has_exclusions = exclude_patterns and len(all_files) < len(all_files_before_exclude)
+    has_exclusions = exclude_patterns and len(all_files) < tracked_count
+    # --all también depende de git: sin repositorio se pasa la lista recorrida
+    is_git_repo = os.path.exists(project_root / ".git")
     tenant = env_vars.get("CHROMA_TENANT", "default_tenant")
-    if has_exclusions:
+    if has_exclusions or not is_git_repo:
         print(f"\n🚀 Iniciando indexación con CHROMA_TENANT={tenant}...")
         print(f"   Proyecto: {project_root}")
         print(f"   Archivos a indexar: {len(all_files)}")
-        print("   (Usando indexación archivo por archivo debido a exclusiones de .git/info/exclude)")
+        if has_exclusions:
+            print("   (Indexando la lista de archivos debido a exclusiones de .git/info/exclude)")
+        else:
+            print("   (Indexando la lista de archivos: el proyecto no es un repositorio git)")
         
-        # Indexar archivo por archivo
+        # Todas las rutas vienen de git ls-files bajo project_root: basta con cortar
+        # el prefijo en lugar de un relative_to() (que recorre y crea un Path) por archivo
+        prefix_len = len(str(project_root)) + len(os.sep)
+        rel_paths = [str(file_path)[prefix_len:] for file_path in all_files]
+        cmd = [str(client_script), "index-stdin", "--repo-root", str(project_root)]
+        # Las rutas viajan por stdin/stdout del proceso hijo en UTF-8
+        env["PYTHONIOENCODING"] = "utf-8"
+        
+        # Cada trabajador es un proceso 'index-stdin' que vive toda la indexación.
+        # Con un cliente local (persistent/ephemeral) varios procesos escribiendo en
+        # la misma base de datos se bloquearían, así que se usa uno solo
+        if env.get("CHROMA_CLIENT_TYPE") in ("http", "cloud"):
+            workers = min(max_workers, len(rel_paths)) or 1
+        else:
+            workers = 1
+        if workers > 1:
+            print(f"   ({workers} procesos de indexación en paralelo)")
+        
+        # Los hilos dejan un resultado por archivo en la cola; aquí se cuentan. El
+        # progreso se reescribe en la misma línea como mucho cada PROGRESS_INTERVAL
+        # segundos y los errores se acumulan para mostrarlos al final
+        results: "queue.Queue[Tuple[str, str]]" = queue.Queue()
         indexed_count = 0
-        for file_path in all_files:
-            try:
-                # Obtener ruta relativa desde la raíz del proyecto
-                rel_path = file_path.relative_to(project_root)
-                cmd = [str(client_script), "index", str(rel_path), "--repo-root", str(project_root)]
-                result = subprocess.run(
-                    cmd,
-                    cwd=str(project_root),
-                    env=env,
-                    check=False,
-                    capture_output=True,
-                    text=True
-                )
-                
-                if result.returncode == 0:
+        failed_paths: List[str] = []
+        last_report = 0.0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_index_worker, rel_paths[i::workers], cmd, project_root, env, results)
+                for i in range(workers)
+            ]
+            for _ in range(len(rel_paths)):
+                rel_path, status = results.get()
+                if status == "ok":
                     indexed_count += 1
-                    if indexed_count % 10 == 0:
-                        print(f"   Indexados {indexed_count}/{len(all_files)} archivos...")
-                else:
-                    print(f"   ⚠️  Error indexando {rel_path}: {result.stderr}", file=sys.stderr)
-            except Exception as e:
-                print(f"   ⚠️  Error indexando {file_path}: {e}", file=sys.stderr)
+                elif status == "error":
+                    failed_paths.append(rel_path)
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    sys.stdout.write(f"   Indexados {indexed_count}/{len(all_files)} archivos...\r")
+                    sys.stdout.flush()
+            worker_stderr = [future.result() for future in futures]
+        print(f"   Indexados {indexed_count}/{len(all_files)} archivos...")
+        
+        if failed_paths:
+            print(f"\n⚠️  {len(failed_paths)} archivos con errores:", file=sys.stderr)
+            print("\n".join(f"   - {rel_path}" for rel_path in failed_paths), file=sys.stderr)
+            stderr_text = "".join(worker_stderr).strip()
+            if stderr_text:
+                print(stderr_text, file=sys.stderr)
         
         print(f"\n✅ Indexación completada: {indexed_count}/{len(all_files)} archivos indexados")
         return 0 if indexed_count > 0 else 1
@@ -355,7 +531,17 @@ def run_indexing(project_root: Path, mcp_config: Dict[str, Any]) -> int:
             print(f"❌ Error ejecutando el comando de indexación: {e}", file=sys.stderr)
             sys.exit(1)
 
-def main():
+def _positive_int(value: str) -> int:
+    """Tipo de argparse para enteros mayores que cero."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' no es un número entero")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"debe ser al menos 1 (recibido: {number})")
+    return number
+
+def main(argv: Optional[List[str]] = None):
     """Función principal."""
     parser = argparse.ArgumentParser(
         description="Indexa todos los documentos de un proyecto en ChromaDB.",
@@ -366,8 +552,14 @@ def main():
         type=str,
         help="Ruta del proyecto a indexar (si no se proporciona, se pregunta interactivamente)"
     )
+    parser.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Procesos de indexación en paralelo con clientes http/cloud (por defecto: {DEFAULT_MAX_WORKERS})"
+    )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     print("🔍 Indexador de Proyecto para ChromaDB")
     print()
@@ -387,7 +579,7 @@ def main():
     print(f"✅ CHROMA_TENANT: {tenant}\n")
     
     # Ejecutar indexación (pasa todo el mcp_config para extraer todas las variables)
-    exit_code = run_indexing(project_path, mcp_config)
+    exit_code = run_indexing(project_path, mcp_config, max_workers=args.jobs)
     
     return exit_code
 
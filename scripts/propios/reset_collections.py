@@ -5,49 +5,18 @@ Lee la configuración del .cursor/mcp.json del proyecto del usuario.
 """
 import os
 import sys
-import json
+import re
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Optional, Tuple
 
-# Configurar codificación UTF-8 para stdin/stdout/stderr
-if sys.version_info >= (3, 7):
-    try:
-        sys.stdin.reconfigure(encoding='utf-8')
-        sys.stdout.reconfigure(encoding='utf-8')
-        sys.stderr.reconfigure(encoding='utf-8')
-    except (AttributeError, ValueError):
-        os.environ['PYTHONIOENCODING'] = 'utf-8'
-else:
-    os.environ['PYTHONIOENCODING'] = 'utf-8'
+# Utilidades compartidas con el resto de scripts de scripts/propios
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import get_chroma_mcp_server_root, _canonicalize, read_mcp_json, _parse_bool, _parse_env_text, pushd, _require_dir, _prompt_dir, DirError, get_chroma_env_vars_from_mcp_json, _utf8_setup
 
-def get_chroma_mcp_server_root() -> Path:
-    """
-    Obtiene la raíz del proyecto chroma_mcp_server buscando marcadores como
-    pyproject.toml o Makefile, empezando desde el directorio del script.
-    """
-    # Obtener el directorio donde está este script
-    script_dir = Path(__file__).parent.resolve()
-    
-    # Buscar hacia arriba desde el script hasta encontrar la raíz del proyecto
-    current = script_dir
-    markers = ["pyproject.toml", "Makefile", ".git"]
-    
-    # Buscar hasta 5 niveles arriba (por si acaso)
-    for _ in range(5):
-        # Verificar si encontramos algún marcador
-        for marker in markers:
-            if (current / marker).exists():
-                return current.resolve()
-        # Si no encontramos, subir un nivel
-        parent = current.parent
-        if parent == current:  # Llegamos a la raíz del sistema
-            break
-        current = parent
-    
-    # Fallback: usar el cálculo relativo (dos niveles arriba desde scripts/propios)
-    fallback_root = script_dir.parent.parent
-    return fallback_root.resolve()
+# Configurar codificación UTF-8 para stdin/stdout/stderr
+_utf8_setup()
 
 # Obtener la raíz del proyecto chroma_mcp_server dinámicamente
 CHROMA_MCP_SERVER_ROOT = get_chroma_mcp_server_root()
@@ -55,91 +24,65 @@ CHROMA_MCP_SERVER_ROOT = get_chroma_mcp_server_root()
 def get_project_path(project_path_arg: Optional[str] = None) -> Path:
     """Obtiene la ruta del proyecto destino, ya sea desde argumento o preguntando al usuario."""
     if project_path_arg:
-        project_path = os.path.expanduser(project_path_arg)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"❌ Error: La ruta {project_path} no existe.", file=sys.stderr)
-            sys.exit(1)
-        
-        if not project_path.is_dir():
-            print(f"❌ Error: {project_path} no es un directorio.", file=sys.stderr)
+        # Un solo stat() para comprobar que existe y que es un directorio
+        try:
+            return _require_dir(_canonicalize(project_path_arg))
+        except DirError as e:
+            print(f"❌ Error: {e}.", file=sys.stderr)
             sys.exit(1)
-        
-        return project_path
     
-    # Si no se pasó argumento, preguntar interactivamente
+    # Si no se pasó argumento, preguntar interactivamente hasta obtener una ruta válida
     while True:
         try:
-            project_path = input("📁 Ingresa la ruta del proyecto: ").strip()
+            return _require_dir(_prompt_dir("📁 Ingresa la ruta del proyecto: "))
+        except DirError as e:
+            print(f"⚠️  {e}. Intenta de nuevo.")
         except UnicodeError as e:
             print(f"⚠️  Error de codificación al leer la entrada: {e}", file=sys.stderr)
             print("💡 Intenta ejecutar el script con: PYTHONIOENCODING=utf-8 python3 reset_collections.py", file=sys.stderr)
             sys.exit(1)
-        
-        if not project_path:
-            print("⚠️  La ruta no puede estar vacía. Intenta de nuevo.")
-            continue
-        
-        project_path = os.path.expanduser(project_path)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"⚠️  La ruta {project_path} no existe. Intenta de nuevo.")
-            continue
-        
-        if not project_path.is_dir():
-            print(f"⚠️  {project_path} no es un directorio. Intenta de nuevo.")
-            continue
-        
-        return project_path
 
-def read_mcp_json(mcp_json_path: Path) -> Dict[str, Any]:
-    """Lee el archivo mcp.json y retorna su contenido."""
-    if not mcp_json_path.exists():
-        print(f"❌ Error: No se encontró el archivo {mcp_json_path}", file=sys.stderr)
-        sys.exit(1)
-    
+# Variables sin las que no tiene sentido intentar conectar
+_REQUIRED_ENV_VARS = ("CHROMA_CLIENT_TYPE",)
+
+def _read_project_dotenv(project_path: Path) -> Dict[str, str]:
+    """Lee el .env del proyecto (el que carga get_client_and_ef); {} si no hay o no se puede leer."""
     try:
-        with open(mcp_json_path, 'r', encoding='utf-8') as f:
-            mcp_config = json.load(f)
-        return mcp_config
-    except json.JSONDecodeError as e:
-        print(f"❌ Error al leer {mcp_json_path}: {e}", file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        print(f"❌ Error al leer {mcp_json_path}: {e}", file=sys.stderr)
-        sys.exit(1)
+        return _parse_env_text((project_path / ".env").read_text(encoding="utf-8", errors="replace"))
+    except OSError:
+        return {}
 
-def get_chroma_env_vars_from_mcp_json(mcp_config: Dict[str, Any]) -> Dict[str, str]:
-    """Extrae todas las variables de entorno relevantes del mcp.json."""
-    chroma_config = mcp_config.get("mcpServers", {}).get("chroma", {})
-    env_vars = chroma_config.get("env", {})
-    
-    # Variables relevantes para conectar a ChromaDB
-    relevant_vars = {
-        "CHROMA_CLIENT_TYPE": env_vars.get("CHROMA_CLIENT_TYPE"),
-        "CHROMA_HOST": env_vars.get("CHROMA_HOST"),
-        "CHROMA_PORT": env_vars.get("CHROMA_PORT"),
-        "CHROMA_SSL": env_vars.get("CHROMA_SSL"),
-        "CHROMA_API_KEY": env_vars.get("CHROMA_API_KEY"),
-        "CHROMA_TENANT": env_vars.get("CHROMA_TENANT"),
-        "CHROMA_DATABASE": env_vars.get("CHROMA_DATABASE"),
-        "CHROMA_DATA_DIR": env_vars.get("CHROMA_DATA_DIR"),
-        "CHROMA_EMBEDDING_FUNCTION": env_vars.get("CHROMA_EMBEDDING_FUNCTION"),
-        "OPENAI_API_KEY": env_vars.get("OPENAI_API_KEY"),
-    }
-    
-    return {k: v for k, v in relevant_vars.items() if v is not None}
+def _resolve_connection_var(name: str, env_vars: Dict[str, str], dotenv_vars: Dict[str, str]) -> Optional[str]:
+    """
+    Valor efectivo de una variable de conexión con la misma precedencia que
+    get_client_and_ef: el mcp.json (se pasa como argumento), luego el .env del
+    proyecto (se carga con override=True) y por último el entorno.
+    """
+    return env_vars.get(name) or dotenv_vars.get(name) or os.environ.get(name)
+
+# Mensajes de error de ChromaDB que indican que la colección no existe
+_NOT_FOUND_RE = re.compile(r"does not exist|not found|404", re.IGNORECASE)
 
-# Agregar el directorio src al path para importar módulos
-sys.path.insert(0, str(CHROMA_MCP_SERVER_ROOT / "src"))
+def _delete_one(client, collection_name: str) -> Tuple[str, Optional[Exception]]:
+    """Borra una colección y retorna (nombre, error)."""
+    try:
+        # Una sola petición: delete_collection ya borra todos los documentos y
+        # falla si la colección no existe, así que get_collection() y count()
+        # previos no aportan nada
+        client.delete_collection(name=collection_name)
+        return collection_name, None
+    except Exception as e:
+        return collection_name, e
 
-from chroma_mcp_client.connection import get_client_and_ef
+def _create_one(client, ef, collection_name: str) -> Tuple[str, Optional[Exception]]:
+    """Crea una colección (si no existe) y retorna (nombre, error)."""
+    try:
+        client.get_or_create_collection(name=collection_name, embedding_function=ef)
+        return collection_name, None
+    except Exception as e:
+        return collection_name, e
 
-def main():
+def main(argv: Optional[list[str]] = None):
     """Borra todas las colecciones y las recrea."""
     parser = argparse.ArgumentParser(
         description="Borra todas las colecciones de ChromaDB y las recrea.",
@@ -151,7 +94,7 @@ def main():
         help="Ruta del proyecto (si no se proporciona, se pregunta interactivamente)"
     )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     print("🔄 Reseteando colecciones de ChromaDB\n")
     
@@ -167,20 +110,37 @@ def main():
     # Extraer variables de entorno del mcp.json
     env_vars = get_chroma_env_vars_from_mcp_json(mcp_config)
     
+    # Validar la configuración antes de importar chromadb y conectar: si falta
+    # algo, mejor fallar ahora que tras cargar el modelo de embeddings
+    dotenv_vars = _read_project_dotenv(project_path)
+    missing = [k for k in _REQUIRED_ENV_VARS if not _resolve_connection_var(k, env_vars, dotenv_vars)]
+    if missing:
+        print(f"❌ Faltan variables (no están en el mcp.json, el .env del proyecto ni el entorno): {', '.join(missing)}", file=sys.stderr)
+        return 2
+    client_type = _resolve_connection_var("CHROMA_CLIENT_TYPE", env_vars, dotenv_vars)
+    if client_type == "http" and not _resolve_connection_var("CHROMA_HOST", env_vars, dotenv_vars):
+        print("❌ CHROMA_CLIENT_TYPE es 'http' pero falta CHROMA_HOST en el mcp.json, el .env del proyecto y el entorno", file=sys.stderr)
+        return 2
+    
     # Convertir SSL de string a bool si está presente
-    ssl_val = None
-    if "CHROMA_SSL" in env_vars:
-        ssl_str = env_vars["CHROMA_SSL"]
-        ssl_val = ssl_str.lower() in ["true", "1", "yes"]
+    ssl_val = _parse_bool(env_vars.get("CHROMA_SSL"))
+    
+    # Importar el cliente solo ahora: chroma_mcp_client.connection arrastra chromadb,
+    # dotenv y las librerías de embeddings, que no hacen falta para --help ni si
+    # falla la lectura del mcp.json
+    sys.path.insert(0, str(CHROMA_MCP_SERVER_ROOT / "src"))
+    from chroma_mcp_client.connection import get_client_and_ef
     
     # Cambiar al directorio del proyecto del usuario para que find_project_root()
     # encuentre el .env del proyecto del usuario si existe
-    original_cwd = os.getcwd()
-    try:
-        os.chdir(str(project_path))
-        
+    with pushd(project_path):
         # Conectar a ChromaDB usando el cliente de chroma_mcp_client
-        # Pasando TODOS los parámetros directamente desde el mcp.json
+        # Pasando TODOS los parámetros directamente desde el mcp.json.
+        # Todas las operaciones del script usan este mismo cliente: con
+        # chromadb>=1.0 el HttpClient mantiene un único httpx.Client con
+        # conexiones keep-alive, así que no se abre una conexión por petición.
+        # get_client_and_ef está cacheado por configuración: si otro paso del
+        # mismo proceso (setup-all) ya conectó con estos valores, se reutiliza
         print("🔌 Conectando a ChromaDB...")
         client, ef = get_client_and_ef(
             tenant=env_vars.get("CHROMA_TENANT"),
@@ -194,9 +154,6 @@ def main():
             embedding_function=env_vars.get("CHROMA_EMBEDDING_FUNCTION"),
             openai_api_key=env_vars.get("OPENAI_API_KEY"),
         )
-    finally:
-        # Restaurar el directorio original
-        os.chdir(original_cwd)
 
     # Colecciones a borrar
     collections_to_delete = [
@@ -211,65 +168,43 @@ def main():
     print("🗑️  Borrando colecciones de ChromaDB...")
     deleted_count = 0
     
-    for collection_name in collections_to_delete:
-        try:
-            # Intentar obtener la colección
-            collection = client.get_collection(name=collection_name)
-            count = collection.count()
-            
-            # Primero borrar todos los documentos de la colección
-            if count > 0:
-                print(f"  🗑️  Borrando {count} documentos de '{collection_name}'...")
-                # Obtener todos los IDs
-                all_data = collection.get()
-                if all_data and 'ids' in all_data and len(all_data['ids']) > 0:
-                    # Borrar todos los documentos por lotes
-                    batch_size = 100
-                    ids = all_data['ids']
-                    for i in range(0, len(ids), batch_size):
-                        batch_ids = ids[i:i+batch_size]
-                        collection.delete(ids=batch_ids)
-                    print(f"    ✅ {count} documentos borrados")
-            
-            # Luego borrar la colección
-            client.delete_collection(name=collection_name)
+    # Cada colección es independiente: con un cliente http/cloud se borran en
+    # paralelo para solapar la latencia de red. Con un cliente local (persistent/
+    # ephemeral) no hay red que solapar y SQLite serializa las escrituras: se
+    # trabaja secuencialmente. Los resultados se muestran en el orden de la lista
+    if client_type in ("http", "cloud"):
+        max_workers = len(collections_to_delete)
+    else:
+        max_workers = 1
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda name: _delete_one(client, name), collections_to_delete))
+    
+    for collection_name, e in results:
+        if e is None:
             print(f"✅ Colección '{collection_name}' borrada exitosamente")
             deleted_count += 1
-        except Exception as e:
+        else:
             # Si la colección no existe, simplemente continuar
-            error_str = str(e).lower()
-            if "does not exist" in error_str or "not found" in error_str or "404" in error_str:
+            if _NOT_FOUND_RE.search(str(e)):
                 print(f"ℹ️  Colección '{collection_name}' no existe, omitiendo")
             else:
                 print(f"⚠️  Error al borrar '{collection_name}': {e}")
 
     print(f"\n✅ Proceso completado. {deleted_count} colecciones borradas.")
     
-    # Recrear las colecciones usando setup-collections
+    # Recrear las colecciones con el mismo cliente (y el mismo embedding function)
+    # en lugar de lanzar chroma-client.sh setup-collections en otro proceso
     print("\n🔄 Recreando colecciones...")
-    try:
-        import subprocess
-        script_dir = Path(__file__).parent.resolve()
-        chroma_client_script = script_dir / "chroma-client.sh"
-        
-        if chroma_client_script.exists():
-            result = subprocess.run(
-                [str(chroma_client_script), "setup-collections"],
-                capture_output=True,
-                text=True,
-                cwd=str(script_dir)
-            )
-            if result.returncode == 0:
-                print("✅ Colecciones recreadas exitosamente")
-            else:
-                print(f"⚠️  Error al recrear colecciones: {result.stderr}")
-                print("💡 Puedes recrearlas manualmente con: ./chroma-client.sh setup-collections")
-        else:
-            print("⚠️  No se encontró chroma-client.sh, no se pueden recrear las colecciones automáticamente")
-            print("💡 Recrea las colecciones manualmente con: ./chroma-client.sh setup-collections")
-    except Exception as e:
-        print(f"⚠️  Error al recrear colecciones: {e}")
-        print("💡 Recrea las colecciones manualmente con: ./chroma-client.sh setup-collections")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda name: _create_one(client, ef, name), collections_to_delete))
+    
+    failed = [(collection_name, e) for collection_name, e in results if e is not None]
+    if not failed:
+        print("✅ Colecciones recreadas exitosamente")
+    else:
+        for collection_name, e in failed:
+            print(f"⚠️  Error al recrear '{collection_name}': {e}")
+        print("💡 Puedes recrearlas manualmente con: ./chroma-client.sh setup-collections")
     
     return 0
 
@@ -6,42 +6,21 @@ Ejecuta todas las configuraciones necesarias en secuencia.
 """
 import os
 import sys
-import subprocess
+import functools
+import importlib.util
+import threading
 from pathlib import Path
 from typing import Optional
 
-# Configurar codificación UTF-8 para stdin/stdout/stderr
-# Asegurar que PYTHONIOENCODING esté configurado antes de cualquier operación
+# Los procesos hijos (make) heredan PYTHONIOENCODING
 os.environ['PYTHONIOENCODING'] = 'utf-8'
 
-if sys.version_info >= (3, 7):
-    try:
-        # Intentar reconfigurar los streams con manejo de errores
-        if sys.stdin.isatty():
-            sys.stdin.reconfigure(encoding='utf-8', errors='replace')
-        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
-        sys.stderr.reconfigure(encoding='utf-8', errors='replace')
-    except (AttributeError, ValueError, OSError):
-        # Si falla, al menos tenemos PYTHONIOENCODING configurado
-        pass
+# Utilidades compartidas con el resto de scripts de scripts/propios
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import get_chroma_mcp_server_root, run_steps_concurrently, _require_dir, _prompt_dir, DirError, _utf8_setup
 
-def get_chroma_mcp_server_root() -> Path:
-    """Obtiene la raíz del proyecto chroma_mcp_server."""
-    script_dir = Path(__file__).parent.resolve()
-    current = script_dir
-    markers = ["pyproject.toml", "Makefile", ".git"]
-    
-    for _ in range(5):
-        for marker in markers:
-            if (current / marker).exists():
-                return current.resolve()
-        parent = current.parent
-        if parent == current:
-            break
-        current = parent
-    
-    fallback_root = script_dir.parent.parent
-    return fallback_root.resolve()
+# Configurar codificación UTF-8 para stdin/stdout/stderr
+_utf8_setup()
 
 def safe_input(prompt: str) -> str:
     """Lee entrada del usuario con manejo robusto de codificación UTF-8."""
@@ -66,8 +45,10 @@ def get_project_path() -> Path:
     """Pregunta al usuario la ruta del proyecto destino."""
     while True:
         try:
-            project_path = safe_input("📁 Ingresa la ruta del proyecto a configurar: ")
-                
+            # Un solo stat() para comprobar que existe y que es un directorio
+            return _require_dir(_prompt_dir("📁 Ingresa la ruta del proyecto a configurar: ", safe_input))
+        except DirError as e:
+            print(f"⚠️  {e}. Intenta de nuevo.")
         except (UnicodeError, UnicodeDecodeError) as e:
             print(f"\n⚠️  Error de codificación al leer la entrada: {e}", file=sys.stderr)
             print("💡 Asegúrate de que tu terminal esté configurado con UTF-8", file=sys.stderr)
@@ -79,30 +60,35 @@ def get_project_path() -> Path:
         except Exception as e:
             print(f"\n⚠️  Error inesperado al leer entrada: {e}", file=sys.stderr)
             sys.exit(1)
-        
-        if not project_path:
-            print("⚠️  La ruta no puede estar vacía. Intenta de nuevo.")
-            continue
-        
-        project_path = os.path.expanduser(project_path)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"⚠️  La ruta {project_path} no existe. Intenta de nuevo.")
-            continue
-        
-        if not project_path.is_dir():
-            print(f"⚠️  {project_path} no es un directorio. Intenta de nuevo.")
-            continue
-        
-        return project_path
 
 def check_env_exists(chroma_mcp_server_root: Path) -> bool:
     """Verifica si existe el archivo .env en chroma_mcp_server."""
     env_file = chroma_mcp_server_root / ".env"
     return env_file.exists()
 
+def _fast_copy(src: Path, dst: Path) -> None:
+    """
+    Copia src en dst con os.sendfile, que mueve los datos dentro del kernel sin
+    pasar por buffers de Python. Si sendfile no está disponible o falla, recurre
+    a shutil.copyfileobj con bloques de 1 MiB.
+    """
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        try:
+            while remaining > 0:
+                sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, remaining)
+                if sent == 0:
+                    break
+                offset += sent
+                remaining -= sent
+        except (AttributeError, OSError):
+            import shutil
+            fsrc.seek(offset)
+            fdst.seek(offset)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst, length=1 << 20)
+
 def create_env_from_template(chroma_mcp_server_root: Path) -> bool:
     """Crea el archivo .env desde el template si existe."""
     env_file = chroma_mcp_server_root / ".env"
@@ -110,8 +96,7 @@ def create_env_from_template(chroma_mcp_server_root: Path) -> bool:
     
     if template_file.exists():
         try:
-            import shutil
-            shutil.copy(template_file, env_file)
+            _fast_copy(template_file, env_file)
             print(f"✅ Archivo .env creado desde template en {env_file}")
             print("⚠️  IMPORTANTE: Edita el archivo .env con tus valores antes de continuar.")
             try:
@@ -131,48 +116,108 @@ def create_env_from_template(chroma_mcp_server_root: Path) -> bool:
         print(f"💡 Crea manualmente el archivo .env en {chroma_mcp_server_root}")
         return False
 
-def run_script_interactive(script_path: Path, args: Optional[list[str]] = None, cwd: Optional[Path] = None) -> bool:
-    """Ejecuta un script Python de forma interactiva (el usuario interactúa directamente)."""
+def load_script(script_path: Path):
+    """
+    Carga un script de scripts/propios como módulo. Los nombres con guiones
+    (setup-mcp-config.py...) no se pueden importar con import, así que se cargan
+    desde su ruta; cada script se carga una sola vez por proceso.
+    """
+    module_name = script_path.stem.replace('-', '_')
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, script_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            # No dejar en caché un módulo a medio inicializar: la siguiente
+            # carga debe repetir el import y mostrar el error real
+            sys.modules.pop(module_name, None)
+            raise
+    return module
+
+def run_script_interactive(script_path: Path, args: Optional[list[str]] = None) -> bool:
+    """
+    Ejecuta el main() de un script en este mismo proceso (el usuario interactúa
+    directamente). Sin un intérprete nuevo por paso no se repite el arranque de
+    Python ni la importación de chromadb, y la caché de get_client_and_ef se
+    comparte entre pasos.
+    """
     try:
-        cmd = [sys.executable, str(script_path)]
-        if args:
-            cmd.extend(args)
-        
-        # Ejecutar el script directamente, permitiendo interacción del usuario
-        result = subprocess.run(
-            cmd,
-            cwd=str(cwd) if cwd else None,
-            timeout=600  # 10 minutos para scripts interactivos
-        )
-        return result.returncode == 0
-    except subprocess.TimeoutExpired:
-        print(f"❌ Timeout ejecutando {script_path.name}", file=sys.stderr)
-        return False
+        module = load_script(script_path)
+        return module.main(args or []) == 0
+    except SystemExit as e:
+        # Los scripts terminan con sys.exit() en sus errores
+        return e.code in (0, None)
     except Exception as e:
         print(f"❌ Error ejecutando {script_path.name}: {e}", file=sys.stderr)
         return False
 
+def run_scripts_concurrently(steps: list[tuple[str, Path, list[str]]], project_path: Path) -> list[bool]:
+    """
+    Ejecuta en paralelo pasos (título, script, argumentos) independientes y no
+    interactivos. Retorna si cada uno tuvo éxito, en el mismo orden que steps; la
+    salida de cada paso se imprime al terminar, precedida de su título.
+    """
+    # Cargar los módulos antes de lanzar los hilos: su código de nivel de módulo
+    # (configuración de streams, etc.) se ejecuta una sola vez y en el hilo principal
+    for _, script_path, _ in steps:
+        try:
+            load_script(script_path)
+        except Exception:
+            pass  # run_script_interactive informará del error
+    
+    return run_steps_concurrently(
+        [(title, functools.partial(run_script_interactive, script_path, args)) for title, script_path, args in steps],
+        subtitle=f"💡 Proyecto: {project_path}",
+    )
+
+def _pump(src, dst) -> None:
+    """Copia un pipe binario a un stream de salida en bloques de 64 KiB, a medida que llegan."""
+    while True:
+        chunk = src.read(65536)
+        if not chunk:
+            break
+        dst.write(chunk)
+        dst.flush()
+
 def run_make_command(command: str, chroma_mcp_server_root: Path) -> bool:
-    """Ejecuta una orden del Makefile."""
+    """
+    Ejecuta una orden del Makefile. La salida se reenvía en binario mientras se
+    produce, sin acumularla en memoria ni decodificarla entera al final.
+    """
+    # subprocess solo hace falta aquí: los scripts de cada paso se ejecutan en proceso
+    import subprocess
     try:
-        result = subprocess.run(
+        proc = subprocess.Popen(
             ['make', command],
             cwd=str(chroma_mcp_server_root),
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            timeout=300
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0
         )
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pumps = [
+            threading.Thread(target=_pump, args=(proc.stdout, sys.stdout.buffer), daemon=True),
+            threading.Thread(target=_pump, args=(proc.stderr, sys.stderr.buffer), daemon=True),
+        ]
+        for pump in pumps:
+            pump.start()
         
-        if result.stdout:
-            print(result.stdout)
-        if result.stderr:
-            print(result.stderr, file=sys.stderr)
+        try:
+            returncode = proc.wait(timeout=300)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            print(f"❌ Timeout ejecutando make {command}", file=sys.stderr)
+            return False
+        finally:
+            for pump in pumps:
+                pump.join()
         
-        return result.returncode == 0
-    except subprocess.TimeoutExpired:
-        print(f"❌ Timeout ejecutando make {command}", file=sys.stderr)
-        return False
+        return returncode == 0
     except Exception as e:
         print(f"❌ Error ejecutando make {command}: {e}", file=sys.stderr)
         return False
@@ -240,23 +285,18 @@ def main():
     if not run_script_interactive(reset_collections_script, ["--project-path", str(project_path)]):
         print("❌ Error en reset-collections. Continuando de todas formas...")
     
-    # 6. generate-cursor-rules
-    print("\n" + "=" * 60)
-    print("5️⃣  Generando reglas de Cursor...")
-    print("=" * 60)
-    print(f"💡 Proyecto: {project_path}\n")
+    # 6-7. generate-cursor-rules y setup-git-hook escriben en rutas distintas
+    # (.cursor/rules y .git/hooks): se ejecutan en paralelo
     generate_rules_script = scripts_dir / "generate_cursor_rules.py"
-    if not run_script_interactive(generate_rules_script, ["--project-path", str(project_path)]):
-        print("❌ Error en generate-cursor-rules. Continuando de todas formas...")
-    
-    # 7. setup-git-hook
-    print("\n" + "=" * 60)
-    print("6️⃣  Configurando hook de Git...")
-    print("=" * 60)
-    print(f"💡 Proyecto: {project_path}\n")
     setup_git_hook_script = scripts_dir / "setup-git-hook.py"
-    # Pasar --force para sobrescribir si ya existe
-    if not run_script_interactive(setup_git_hook_script, ["--project-path", str(project_path), "--force"]):
+    rules_ok, hook_ok = run_scripts_concurrently([
+        ("5️⃣  Generando reglas de Cursor...", generate_rules_script, ["--project-path", str(project_path)]),
+        # Pasar --force para sobrescribir si ya existe
+        ("6️⃣  Configurando hook de Git...", setup_git_hook_script, ["--project-path", str(project_path), "--force"]),
+    ], project_path)
+    if not rules_ok:
+        print("❌ Error en generate-cursor-rules. Continuando de todas formas...")
+    if not hook_ok:
         print("❌ Error en setup-git-hook. Continuando de todas formas...")
     
     # 8. Preguntar si indexar
@@ -6,100 +6,91 @@ los archivos modificados usando la configuración del .cursor/mcp.json del proye
 """
 import os
 import sys
-import json
-import argparse
+import stat
+import string
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+
+# Utilidades compartidas con el resto de scripts de scripts/propios
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import get_chroma_mcp_server_root, _canonicalize, read_mcp_json, _require_dir, _prompt_dir, DirError, parse_simple_argv, _utf8_setup
 
 # Configurar codificación UTF-8 para stdin/stdout/stderr
-if sys.version_info >= (3, 7):
+_utf8_setup()
+
+def _validate_git_dir(project_path: Path) -> Path:
+    """
+    Comprueba que project_path es un directorio con .git; si no, lanza DirError.
+    .git puede ser un directorio o, en worktrees y submódulos, un archivo con
+    la línea "gitdir: <ruta>".
+    """
+    # Un stat() para el proyecto y otro para .git
+    _require_dir(project_path)
     try:
-        sys.stdin.reconfigure(encoding='utf-8')
-        sys.stdout.reconfigure(encoding='utf-8')
-        sys.stderr.reconfigure(encoding='utf-8')
-    except (AttributeError, ValueError):
-        os.environ['PYTHONIOENCODING'] = 'utf-8'
-else:
-    os.environ['PYTHONIOENCODING'] = 'utf-8'
+        git_mode = os.stat(project_path / ".git").st_mode
+    except OSError:
+        raise DirError(f"{project_path} no es un repositorio Git")
+    if not (stat.S_ISDIR(git_mode) or stat.S_ISREG(git_mode)):
+        raise DirError(f"{project_path} no es un repositorio Git")
+    return project_path
+
+def get_git_hooks_dir(project_path: Path) -> Path:
+    """
+    Obtiene el directorio de hooks del repositorio. Si .git es un archivo
+    (worktree o submódulo) se sigue su "gitdir:"; en un worktree los hooks
+    están en el directorio común que indica el archivo commondir.
+    """
+    git_path = project_path / ".git"
+    if git_path.is_dir():
+        return git_path / "hooks"
+    
+    git_dir = None
+    for line in git_path.read_text(encoding='utf-8').splitlines():
+        if line.startswith("gitdir:"):
+            git_dir = project_path / line[len("gitdir:"):].strip()
+            break
+    if git_dir is None:
+        raise DirError(f"{git_path} no contiene una línea 'gitdir:'")
+    
+    try:
+        common_dir = (git_dir / "commondir").read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        return git_dir.resolve() / "hooks"
+    return (git_dir / common_dir).resolve() / "hooks"
 
 def get_project_path(project_path_arg: Optional[str] = None) -> Path:
     """Obtiene la ruta del proyecto destino, ya sea desde argumento o preguntando al usuario."""
     if project_path_arg:
-        project_path = os.path.expanduser(project_path_arg)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"❌ Error: La ruta {project_path} no existe.", file=sys.stderr)
-            sys.exit(1)
-        
-        if not project_path.is_dir():
-            print(f"❌ Error: {project_path} no es un directorio.", file=sys.stderr)
-            sys.exit(1)
-        
-        # Verificar que es un repositorio git
-        git_dir = project_path / ".git"
-        if not git_dir.exists() or not git_dir.is_dir():
-            print(f"❌ Error: {project_path} no es un repositorio Git.", file=sys.stderr)
+        try:
+            return _validate_git_dir(_canonicalize(project_path_arg))
+        except DirError as e:
+            print(f"❌ Error: {e}.", file=sys.stderr)
             sys.exit(1)
-        
-        return project_path
     
-    # Si no se pasó argumento, preguntar interactivamente
+    # Si no se pasó argumento, preguntar interactivamente hasta obtener una ruta válida
     while True:
         try:
-            project_path = input("📁 Ingresa la ruta del proyecto donde quieres crear el hook de Git: ").strip()
+            return _validate_git_dir(_prompt_dir("📁 Ingresa la ruta del proyecto donde quieres crear el hook de Git: "))
+        except DirError as e:
+            print(f"⚠️  {e}. Intenta de nuevo.")
         except UnicodeError as e:
             print(f"⚠️  Error de codificación al leer la entrada: {e}", file=sys.stderr)
             print("💡 Intenta ejecutar el script con: PYTHONIOENCODING=utf-8 python3 setup-git-hook.py", file=sys.stderr)
             sys.exit(1)
-        
-        if not project_path:
-            print("⚠️  La ruta no puede estar vacía. Intenta de nuevo.")
-            continue
-        
-        # Expandir ~ y variables de entorno
-        project_path = os.path.expanduser(project_path)
-        project_path = os.path.expandvars(project_path)
-        
-        # Convertir a Path y resolver
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"⚠️  La ruta {project_path} no existe. Intenta de nuevo.")
-            continue
-        
-        if not project_path.is_dir():
-            print(f"⚠️  {project_path} no es un directorio. Intenta de nuevo.")
-            continue
-        
-        # Verificar que es un repositorio git
-        git_dir = project_path / ".git"
-        if not git_dir.exists() or not git_dir.is_dir():
-            print(f"⚠️  {project_path} no es un repositorio Git. Intenta de nuevo.")
-            continue
-        
-        return project_path
 
-def read_mcp_json(mcp_json_path: Path) -> Dict[str, Any]:
-    """Lee el archivo mcp.json y retorna su contenido."""
-    if not mcp_json_path.exists():
-        print(f"❌ Error: No se encontró el archivo {mcp_json_path}", file=sys.stderr)
-        print(f"💡 Asegúrate de haber configurado el proyecto con: make setup-mcp-config", file=sys.stderr)
-        sys.exit(1)
-    
-    try:
-        with open(mcp_json_path, 'r', encoding='utf-8') as f:
-            mcp_config = json.load(f)
-        return mcp_config
-    except json.JSONDecodeError as e:
-        print(f"❌ Error al leer {mcp_json_path}: {e}", file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        print(f"❌ Error al leer {mcp_json_path}: {e}", file=sys.stderr)
-        sys.exit(1)
+@dataclass(frozen=True, slots=True)
+class ChromaEnv:
+    """Variables de chroma del mcp.json, extraídas una sola vez."""
+    tenant: Optional[str]
+    database: Optional[str]
+    model: Optional[str]
+    dims: Optional[str]
+    # Todas las variables (incluidas las anteriores) ordenadas por clave,
+    # listas para exportarlas en el hook
+    exports: Tuple[Tuple[str, str], ...]
 
-def get_chroma_env_vars(mcp_config: Dict[str, Any]) -> Dict[str, str]:
+def get_chroma_env_vars(mcp_config: Dict[str, Any]) -> ChromaEnv:
     """Extrae las variables de entorno de la configuración de chroma en mcp.json."""
     chroma_config = mcp_config.get("mcpServers", {}).get("chroma", {})
     
@@ -116,45 +107,29 @@ def get_chroma_env_vars(mcp_config: Dict[str, Any]) -> Dict[str, str]:
     # Retornar TODAS las variables de entorno del mcp.json
     # Esto asegura que todas las variables necesarias estén disponibles en el hook
     # Las variables del mcp.json tienen prioridad sobre las del .env
-    return {k: v for k, v in env_vars.items() if v is not None}
+    # Se ordenan aquí, una sola vez, para que el hook generado sea determinista
+    return ChromaEnv(
+        tenant=env_vars.get("CHROMA_TENANT"),
+        database=env_vars.get("CHROMA_DATABASE"),
+        model=env_vars.get("CHROMA_OPENAI_EMBEDDING_MODEL"),
+        dims=env_vars.get("CHROMA_OPENAI_EMBEDDING_DIMENSIONS"),
+        exports=tuple(sorted((k, v) for k, v in env_vars.items() if v is not None)),
+    )
 
-def get_chroma_mcp_server_root() -> Path:
-    """
-    Obtiene la raíz del proyecto chroma_mcp_server buscando marcadores como
-    pyproject.toml o Makefile, empezando desde el directorio del script.
-    """
-    script_dir = Path(__file__).parent.resolve()
-    current = script_dir
-    markers = ["pyproject.toml", "Makefile", ".git"]
-    
-    for _ in range(5):
-        for marker in markers:
-            if (current / marker).exists():
-                return current.resolve()
-        parent = current.parent
-        if parent == current:
-            break
-        current = parent
-    
-    fallback_root = script_dir.parent.parent
-    return fallback_root.resolve()
+# Caracteres con significado especial dentro de comillas dobles en sh.
+# La barra invertida también se escapa para que un valor que termine en \
+# no se coma la comilla de cierre
+_SH_ESCAPE = str.maketrans({'\\': '\\\\', '"': '\\"', '$': '\\$', '`': '\\`'})
 
-def generate_post_commit_hook(project_path: Path, env_vars: Dict[str, str], chroma_mcp_server_path: Path) -> str:
-    """Genera el contenido del hook post-commit."""
-    
-    # Construir las exportaciones de variables de entorno
-    env_exports = []
-    for key, value in sorted(env_vars.items()):
-        # Escapar comillas y caracteres especiales en el valor
-        escaped_value = value.replace('"', '\\"').replace('$', '\\$').replace('`', '\\`')
-        env_exports.append(f'export {key}="{escaped_value}"')
-    
-    env_exports_str = '\n'.join(env_exports)
-    
-    hook_content = f"""#!/bin/sh
+class _HookTemplate(string.Template):
+    """Template con @ como delimitador: el hook usa $VAR de sh por todas partes."""
+    delimiter = '@'
+
+# Plantilla del hook post-commit, compilada una sola vez al cargar el módulo
+_POST_COMMIT_HOOK_TEMPLATE = _HookTemplate("""#!/bin/sh
 # .git/hooks/post-commit
 # Hook generado automáticamente para indexar archivos modificados en ChromaDB
-# Proyecto: {project_path}
+# Proyecto: @{project_path}
 
 echo "Running post-commit hook: Indexing changed files..."
 
@@ -163,7 +138,7 @@ PROJECT_ROOT=$(git rev-parse --show-toplevel)
 cd "$PROJECT_ROOT" || exit 1
 
 # Configurar variables de entorno desde mcp.json
-{env_exports_str}
+@{env_exports}
 
 # Get list of changed/added files in the last commit
 # Use --diff-filter=AM to only get Added or Modified files
@@ -193,7 +168,7 @@ fi
 
 # Run the indexer using chroma-client.sh from scripts/propios
 # Usar el script chroma-client.sh que carga automáticamente las variables de entorno
-CHROMA_CLIENT_SCRIPT="{chroma_mcp_server_path}/scripts/propios/chroma-client.sh"
+CHROMA_CLIENT_SCRIPT="@{chroma_mcp_server_path}/scripts/propios/chroma-client.sh"
 
 if [ ! -f "$CHROMA_CLIENT_SCRIPT" ]; then
   echo "Error: No se encontró el script $CHROMA_CLIENT_SCRIPT"
@@ -212,11 +187,28 @@ fi
 
 echo "Post-commit indexing complete."
 exit 0
-"""
-    return hook_content
+""")
 
-def main():
-    """Función principal."""
+def generate_post_commit_hook(project_path: Path, env: ChromaEnv, chroma_mcp_server_path: Path) -> str:
+    """Genera el contenido del hook post-commit."""
+    
+    # Construir las exportaciones de variables de entorno; el escape de cada
+    # valor es una sola pasada de translate en lugar de tres replace encadenados
+    env_exports_str = '\n'.join(
+        f'export {key}="{value.translate(_SH_ESCAPE)}"'
+        for key, value in env.exports
+    )
+    
+    return _POST_COMMIT_HOOK_TEMPLATE.substitute(
+        project_path=project_path,
+        env_exports=env_exports_str,
+        chroma_mcp_server_path=chroma_mcp_server_path,
+    )
+
+def build_parser():
+    """Construye el parser de argparse; solo se usa para --help o errores de uso."""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Crea un hook post-commit de Git para indexación automática.",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -231,8 +223,12 @@ def main():
         action="store_true",
         help="Sobrescribir el hook si ya existe sin preguntar"
     )
-    
-    args = parser.parse_args()
+    return parser
+
+def main(argv: Optional[list[str]] = None):
+    """Función principal."""
+    # Parseo directo de argv; argparse solo se importa para --help o errores
+    args = parse_simple_argv(argv, ("--project-path",), ("--force",), build_parser)
     
     print("🔧 Configurador de Git Hook para Indexación Automática\n")
     
@@ -243,23 +239,23 @@ def main():
     # Leer mcp.json
     mcp_json_path = project_path / ".cursor" / "mcp.json"
     print(f"📖 Leyendo configuración desde {mcp_json_path}...")
-    mcp_config = read_mcp_json(mcp_json_path)
+    mcp_config = read_mcp_json(mcp_json_path, hint="Asegúrate de haber configurado el proyecto con: make setup-mcp-config")
     
     # Extraer variables de entorno relevantes
     print("🔍 Extrayendo variables de entorno de la configuración...")
-    env_vars = get_chroma_env_vars(mcp_config)
-    print(f"✅ {len(env_vars)} variables de entorno encontradas\n")
+    env = get_chroma_env_vars(mcp_config)
+    print(f"✅ {len(env.exports)} variables de entorno encontradas\n")
     
     # Mostrar valores importantes
     print("📋 Configuración detectada:")
-    if "CHROMA_TENANT" in env_vars:
-        print(f"   - CHROMA_TENANT: {env_vars['CHROMA_TENANT']}")
-    if "CHROMA_DATABASE" in env_vars:
-        print(f"   - CHROMA_DATABASE: {env_vars['CHROMA_DATABASE']}")
-    if "CHROMA_OPENAI_EMBEDDING_MODEL" in env_vars:
-        print(f"   - CHROMA_OPENAI_EMBEDDING_MODEL: {env_vars['CHROMA_OPENAI_EMBEDDING_MODEL']}")
-    if "CHROMA_OPENAI_EMBEDDING_DIMENSIONS" in env_vars:
-        print(f"   - CHROMA_OPENAI_EMBEDDING_DIMENSIONS: {env_vars['CHROMA_OPENAI_EMBEDDING_DIMENSIONS']}")
+    for key, value in (
+        ("CHROMA_TENANT", env.tenant),
+        ("CHROMA_DATABASE", env.database),
+        ("CHROMA_OPENAI_EMBEDDING_MODEL", env.model),
+        ("CHROMA_OPENAI_EMBEDDING_DIMENSIONS", env.dims),
+    ):
+        if value is not None:
+            print(f"   - {key}: {value}")
     print()
     
     # Obtener la ruta de chroma_mcp_server
@@ -268,17 +264,40 @@ def main():
     
     # Generar el hook
     print("🔧 Generando hook post-commit...")
-    hook_content = generate_post_commit_hook(project_path, env_vars, chroma_mcp_server_path)
+    hook_content = generate_post_commit_hook(project_path, env, chroma_mcp_server_path)
     
-    # Crear el directorio de hooks si no existe
-    hooks_dir = project_path / ".git" / "hooks"
-    hooks_dir.mkdir(parents=True, exist_ok=True)
+    # Crear el directorio de hooks si no existe. En un repositorio válido casi
+    # siempre existe, y el directorio git ya existe, así que no hace falta
+    # parents=True
+    try:
+        hooks_dir = get_git_hooks_dir(project_path)
+    except (DirError, OSError) as e:
+        print(f"❌ Error al localizar el directorio de hooks: {e}", file=sys.stderr)
+        return 1
+    if not hooks_dir.is_dir():
+        hooks_dir.mkdir(exist_ok=True)
     
     # Escribir el hook
     hook_path = hooks_dir / "post-commit"
+    hook_bytes = hook_content.encode('utf-8')
+    
+    # Si ya existe un hook idéntico y ejecutable no hay nada que hacer
+    # (caso habitual al volver a ejecutar el setup)
+    try:
+        existing_mode = os.stat(hook_path).st_mode
+    except FileNotFoundError:
+        existing_mode = None
+    
+    if (
+        existing_mode is not None
+        and stat.S_IMODE(existing_mode) == 0o755
+        and hook_path.read_bytes() == hook_bytes
+    ):
+        print(f"✅ El hook {hook_path} ya está actualizado, no se reescribe.")
+        return 0
     
     # Verificar si ya existe un hook
-    if hook_path.exists() and not args.force:
+    if existing_mode is not None and not args.force:
         print(f"⚠️  El archivo {hook_path} ya existe.")
         response = input("¿Deseas sobrescribirlo? (s/N): ").strip().lower()
         if response not in ['s', 'sí', 'si', 'y', 'yes']:
@@ -286,21 +305,23 @@ def main():
             return 1
     
     try:
-        with open(hook_path, 'w', encoding='utf-8') as f:
-            f.write(hook_content)
+        hook_path.write_bytes(hook_bytes)
         
         # Hacer el hook ejecutable
         os.chmod(hook_path, 0o755)
         
-        print(f"✅ Hook creado exitosamente en {hook_path}")
-        print("\n📋 Resumen:")
-        print(f"   - Proyecto: {project_path}")
-        print(f"   - Hook: {hook_path}")
-        print(f"   - Tenant: {env_vars.get('CHROMA_TENANT', 'N/A')}")
-        print(f"   - Database: {env_vars.get('CHROMA_DATABASE', 'N/A')}")
-        print(f"   - Model: {env_vars.get('CHROMA_OPENAI_EMBEDDING_MODEL', 'N/A')}")
-        print(f"   - Dimensions: {env_vars.get('CHROMA_OPENAI_EMBEDDING_DIMENSIONS', 'N/A')}")
-        print("\n💡 El hook se ejecutará automáticamente después de cada commit.")
+        # Resumen en una sola escritura en lugar de un print() por línea
+        sys.stdout.write(
+            f"✅ Hook creado exitosamente en {hook_path}\n"
+            "\n📋 Resumen:\n"
+            f"   - Proyecto: {project_path}\n"
+            f"   - Hook: {hook_path}\n"
+            f"   - Tenant: {env.tenant or 'N/A'}\n"
+            f"   - Database: {env.database or 'N/A'}\n"
+            f"   - Model: {env.model or 'N/A'}\n"
+            f"   - Dimensions: {env.dims or 'N/A'}\n"
+            "\n💡 El hook se ejecutará automáticamente después de cada commit.\n"
+        )
         
         return 0
     except Exception as e:
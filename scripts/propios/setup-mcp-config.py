@@ -5,57 +5,18 @@ Script para configurar el servidor MCP de ChromaDB en un proyecto.
 Lee el .env de la raíz de chroma_mcp_server y crea/actualiza el .cursor/mcp.json
 del proyecto destino con la configuración del servidor ChromaDB.
 """
-import os
 import sys
 import json
-import argparse
 import re
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-# Configurar codificación UTF-8 para stdin/stdout/stderr
-if sys.version_info >= (3, 7):
-    # Python 3.7+ soporta reconfigure
-    try:
-        sys.stdin.reconfigure(encoding='utf-8')
-        sys.stdout.reconfigure(encoding='utf-8')
-        sys.stderr.reconfigure(encoding='utf-8')
-    except (AttributeError, ValueError):
-        # Si reconfigure no está disponible o falla, usar variables de entorno
-        os.environ['PYTHONIOENCODING'] = 'utf-8'
-else:
-    # Python < 3.7: usar variables de entorno
-    os.environ['PYTHONIOENCODING'] = 'utf-8'
+# Utilidades compartidas con el resto de scripts de scripts/propios
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import get_chroma_mcp_server_root, _canonicalize, _json_loads, _json_dumps, _parse_env_text, _require_dir, _prompt_dir, DirError, parse_simple_argv, _utf8_setup
 
-def get_chroma_mcp_server_root() -> Path:
-    """
-    Obtiene la raíz del proyecto chroma_mcp_server buscando marcadores como
-    pyproject.toml o Makefile, empezando desde el directorio del script.
-    """
-    # Obtener el directorio donde está este script
-    script_dir = Path(__file__).parent.resolve()
-    
-    # Buscar hacia arriba desde el script hasta encontrar la raíz del proyecto
-    # El script está en scripts/propios/, así que la raíz está dos niveles arriba
-    # Pero también buscamos marcadores para asegurarnos
-    current = script_dir
-    markers = ["pyproject.toml", "Makefile", ".git"]
-    
-    # Buscar hasta 5 niveles arriba (por si acaso)
-    for _ in range(5):
-        # Verificar si encontramos algún marcador
-        for marker in markers:
-            if (current / marker).exists():
-                return current.resolve()
-        # Si no encontramos, subir un nivel
-        parent = current.parent
-        if parent == current:  # Llegamos a la raíz del sistema
-            break
-        current = parent
-    
-    # Fallback: usar el cálculo relativo (dos niveles arriba desde scripts/propios)
-    fallback_root = script_dir.parent.parent
-    return fallback_root.resolve()
+# Configurar codificación UTF-8 para stdin/stdout/stderr
+_utf8_setup()
 
 # Obtener la raíz del proyecto chroma_mcp_server dinámicamente
 CHROMA_MCP_SERVER_ROOT = get_chroma_mcp_server_root()
@@ -73,15 +34,7 @@ def load_env_file(env_file: Path) -> Dict[str, str]:
         sys.exit(1)
     
     try:
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                # Ignorar comentarios y líneas vacías
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    # Eliminar comillas si existen
-                    value = value.strip('"\'')
-                    env_vars[key.strip()] = value
+        env_vars = _parse_env_text(env_file.read_text(encoding='utf-8', errors='replace'))
     except Exception as e:
         print(f"❌ Error al cargar .env: {e}", file=sys.stderr)
         sys.exit(1)
@@ -91,49 +44,23 @@ def load_env_file(env_file: Path) -> Dict[str, str]:
 def get_project_path(project_path_arg: Optional[str] = None) -> Path:
     """Obtiene la ruta del proyecto destino, ya sea desde argumento o preguntando al usuario."""
     if project_path_arg:
-        project_path = os.path.expanduser(project_path_arg)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"❌ Error: La ruta {project_path} no existe.", file=sys.stderr)
-            sys.exit(1)
-        
-        if not project_path.is_dir():
-            print(f"❌ Error: {project_path} no es un directorio.", file=sys.stderr)
+        # Un solo stat() para comprobar que existe y que es un directorio
+        try:
+            return _require_dir(_canonicalize(project_path_arg))
+        except DirError as e:
+            print(f"❌ Error: {e}.", file=sys.stderr)
             sys.exit(1)
-        
-        return project_path
     
-    # Si no se pasó argumento, preguntar interactivamente
+    # Si no se pasó argumento, preguntar interactivamente hasta obtener una ruta válida
     while True:
         try:
-            project_path = input("📁 Ingresa la ruta del proyecto donde quieres añadir el MCP server de ChromaDB: ").strip()
+            return _require_dir(_prompt_dir("📁 Ingresa la ruta del proyecto donde quieres añadir el MCP server de ChromaDB: "))
+        except DirError as e:
+            print(f"⚠️  {e}. Intenta de nuevo.")
         except UnicodeError as e:
             print(f"⚠️  Error de codificación al leer la entrada: {e}", file=sys.stderr)
             print("💡 Intenta ejecutar el script con: PYTHONIOENCODING=utf-8 python3 setup-mcp-config.py", file=sys.stderr)
             sys.exit(1)
-        
-        if not project_path:
-            print("⚠️  La ruta no puede estar vacía. Intenta de nuevo.")
-            continue
-        
-        # Expandir ~ y variables de entorno
-        project_path = os.path.expanduser(project_path)
-        project_path = os.path.expandvars(project_path)
-        
-        # Convertir a Path y resolver
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"⚠️  La ruta {project_path} no existe. Intenta de nuevo.")
-            continue
-        
-        if not project_path.is_dir():
-            print(f"⚠️  {project_path} no es un directorio. Intenta de nuevo.")
-            continue
-        
-        return project_path
 
 def normalize_tenant_name(tenant: str) -> str:
     """
@@ -219,8 +146,8 @@ def create_or_load_mcp_json(mcp_json_path: Path) -> Dict[str, Any]:
     """Crea o carga el archivo mcp.json."""
     if mcp_json_path.exists():
         try:
-            with open(mcp_json_path, 'r') as f:
-                mcp_config = json.load(f)
+            # Lectura binaria: orjson (o json) decodifica el UTF-8 directamente
+            mcp_config = _json_loads(mcp_json_path.read_bytes())
         except json.JSONDecodeError as e:
             print(f"⚠️  Error al leer {mcp_json_path}: {e}", file=sys.stderr)
             print("🔄 Creando un nuevo archivo mcp.json...", file=sys.stderr)
@@ -236,13 +163,15 @@ def replace_paths(text: str, old_path: str, new_path: str) -> str:
 
 def build_chroma_config(env_vars: Dict[str, str], tenant: str, chroma_mcp_server_path: str) -> Dict[str, Any]:
     """Construye la configuración del servidor ChromaDB para mcp.json."""
+    # La raíz ya viene resuelta (get_chroma_mcp_server_root), así que basta con
+    # concatenar: no hace falta un resolve() por cada ruta derivada
+    base = Path(chroma_mcp_server_path)
+    
     # Ruta del script run-mcp-server-simple.sh
-    script_path = Path(chroma_mcp_server_path) / "scripts" / "propios" / "run-mcp-server-simple.sh"
-    script_path_str = str(script_path.resolve())
+    script_path_str = str(base / "scripts" / "propios" / "run-mcp-server-simple.sh")
     
     # Ruta del src para PYTHONPATH
-    src_path = Path(chroma_mcp_server_path) / "src"
-    src_path_str = str(src_path.resolve())
+    src_path_str = str(base / "src")
     
     # Construir el objeto de configuración
     chroma_config = {
@@ -287,8 +216,10 @@ def build_chroma_config(env_vars: Dict[str, str], tenant: str, chroma_mcp_server
     
     return chroma_config
 
-def main():
-    """Función principal."""
+def build_parser():
+    """Construye el parser de argparse; solo se usa para --help o errores de uso."""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description="Configura el servidor MCP de ChromaDB en un proyecto.",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -303,8 +234,12 @@ def main():
         type=str,
         help="CHROMA_TENANT a usar (si no se proporciona, se pregunta interactivamente o se usa 'default_tenant')"
     )
-    
-    args = parser.parse_args()
+    return parser
+
+def main(argv: Optional[list[str]] = None):
+    """Función principal."""
+    # Parseo directo de argv; argparse solo se importa para --help o errores
+    args = parse_simple_argv(argv, ("--project-path", "--tenant"), (), build_parser)
     
     print("🔧 Configurador de MCP Server para ChromaDB\n")
     
@@ -332,10 +267,11 @@ def main():
     cursor_dir = project_path / ".cursor"
     mcp_json_path = cursor_dir / "mcp.json"
     
-    # Crear directorio .cursor si no existe
-    if not cursor_dir.exists():
+    # Crear directorio .cursor si no existe (el proyecto ya se validó como
+    # directorio en get_project_path, así que no hace falta parents=True)
+    if not cursor_dir.is_dir():
         print(f"📁 Creando directorio {cursor_dir}...")
-        cursor_dir.mkdir(parents=True, exist_ok=True)
+        cursor_dir.mkdir(exist_ok=True)
     
     # Crear o cargar mcp.json
     mcp_config = create_or_load_mcp_json(mcp_json_path)
@@ -350,8 +286,7 @@ def main():
     # Guardar el archivo mcp.json
     print(f"💾 Guardando configuración en {mcp_json_path}...")
     try:
-        with open(mcp_json_path, 'w') as f:
-            json.dump(mcp_config, f, indent=2)
+        mcp_json_path.write_bytes(_json_dumps(mcp_config))
         print(f"✅ Configuración guardada exitosamente en {mcp_json_path}")
     except Exception as e:
         print(f"❌ Error al guardar {mcp_json_path}: {e}", file=sys.stderr)
@@ -6,40 +6,17 @@ Lee el mcp.json del proyecto y verifica que las colecciones usen el embedding fu
 """
 import os
 import sys
-import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
-# Configurar codificación UTF-8 para stdin/stdout/stderr
-os.environ['PYTHONIOENCODING'] = 'utf-8'
-
-if sys.version_info >= (3, 7):
-    try:
-        if sys.stdin.isatty():
-            sys.stdin.reconfigure(encoding='utf-8', errors='replace')
-        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
-        sys.stderr.reconfigure(encoding='utf-8', errors='replace')
-    except (AttributeError, ValueError, OSError):
-        pass
+# Utilidades compartidas con el resto de scripts de scripts/propios
+sys.path.insert(0, str(Path(__file__).parent))
+from _common import get_chroma_mcp_server_root, _canonicalize, read_mcp_json, _parse_bool, _require_dir, _prompt_dir, DirError, CHROMA_ENV_VARS, get_chroma_env_vars_from_mcp_json, _utf8_setup
 
-def get_chroma_mcp_server_root() -> Path:
-    """Obtiene la raíz del proyecto chroma_mcp_server."""
-    script_dir = Path(__file__).parent.resolve()
-    current = script_dir
-    markers = ["pyproject.toml", "Makefile", ".git"]
-    
-    for _ in range(5):
-        for marker in markers:
-            if (current / marker).exists():
-                return current.resolve()
-        parent = current.parent
-        if parent == current:
-            break
-        current = parent
-    
-    fallback_root = script_dir.parent.parent
-    return fallback_root.resolve()
+# Configurar codificación UTF-8 para stdin/stdout/stderr
+_utf8_setup()
 
 CHROMA_MCP_SERVER_ROOT = get_chroma_mcp_server_root()
 
@@ -66,24 +43,19 @@ def safe_input(prompt: str) -> str:
 def get_project_path(project_path_arg: Optional[str] = None) -> Path:
     """Obtiene la ruta del proyecto destino."""
     if project_path_arg:
-        project_path = os.path.expanduser(project_path_arg)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"❌ Error: La ruta {project_path} no existe.", file=sys.stderr)
-            sys.exit(1)
-        
-        if not project_path.is_dir():
-            print(f"❌ Error: {project_path} no es un directorio.", file=sys.stderr)
+        # Un solo stat() para comprobar que existe y que es un directorio
+        try:
+            return _require_dir(_canonicalize(project_path_arg))
+        except DirError as e:
+            print(f"❌ Error: {e}.", file=sys.stderr)
             sys.exit(1)
-        
-        return project_path
     
-    # Si no se pasó argumento, preguntar interactivamente
+    # Si no se pasó argumento, preguntar interactivamente hasta obtener una ruta válida
     while True:
         try:
-            project_path = safe_input("📁 Ingresa la ruta del proyecto a verificar: ")
+            return _require_dir(_prompt_dir("📁 Ingresa la ruta del proyecto a verificar: ", safe_input))
+        except DirError as e:
+            print(f"⚠️  {e}. Intenta de nuevo.")
         except (UnicodeError, UnicodeDecodeError) as e:
             print(f"\n⚠️  Error de codificación al leer la entrada: {e}", file=sys.stderr)
             print("💡 Asegúrate de que tu terminal esté configurado con UTF-8", file=sys.stderr)
@@ -91,77 +63,68 @@ def get_project_path(project_path_arg: Optional[str] = None) -> Path:
         except (EOFError, KeyboardInterrupt):
             print("\n⚠️  Operación cancelada.", file=sys.stderr)
             sys.exit(1)
-        
-        if not project_path:
-            print("⚠️  La ruta no puede estar vacía. Intenta de nuevo.")
-            continue
-        
-        project_path = os.path.expanduser(project_path)
-        project_path = os.path.expandvars(project_path)
-        project_path = Path(project_path).resolve()
-        
-        if not project_path.exists():
-            print(f"⚠️  La ruta {project_path} no existe. Intenta de nuevo.")
-            continue
-        
-        if not project_path.is_dir():
-            print(f"⚠️  {project_path} no es un directorio. Intenta de nuevo.")
-            continue
-        
-        return project_path
 
-def read_mcp_json(mcp_json_path: Path) -> Dict[str, Any]:
-    """Lee el archivo mcp.json y retorna su contenido."""
-    if not mcp_json_path.exists():
-        print(f"❌ Error: No se encontró el archivo {mcp_json_path}", file=sys.stderr)
-        sys.exit(1)
-    
-    try:
-        with open(mcp_json_path, 'r', encoding='utf-8') as f:
-            mcp_config = json.load(f)
-        return mcp_config
-    except json.JSONDecodeError as e:
-        print(f"❌ Error al leer {mcp_json_path}: {e}", file=sys.stderr)
-        sys.exit(1)
-    except Exception as e:
-        print(f"❌ Error al leer {mcp_json_path}: {e}", file=sys.stderr)
-        sys.exit(1)
+# Variables del env de chroma relevantes para conectar y verificar
+RELEVANT_ENV_VARS = CHROMA_ENV_VARS + (
+    "CHROMA_OPENAI_EMBEDDING_MODEL",
+    "CHROMA_OPENAI_EMBEDDING_DIMENSIONS",
+)
 
-def get_chroma_env_vars_from_mcp_json(mcp_config: Dict[str, Any]) -> Dict[str, str]:
-    """Extrae todas las variables de entorno relevantes del mcp.json."""
-    chroma_config = mcp_config.get("mcpServers", {}).get("chroma", {})
-    env_vars = chroma_config.get("env", {})
-    
-    # Variables relevantes para conectar a ChromaDB
-    relevant_vars = {
-        "CHROMA_CLIENT_TYPE": env_vars.get("CHROMA_CLIENT_TYPE"),
-        "CHROMA_HOST": env_vars.get("CHROMA_HOST"),
-        "CHROMA_PORT": env_vars.get("CHROMA_PORT"),
-        "CHROMA_SSL": env_vars.get("CHROMA_SSL"),
-        "CHROMA_API_KEY": env_vars.get("CHROMA_API_KEY"),
-        "CHROMA_TENANT": env_vars.get("CHROMA_TENANT"),
-        "CHROMA_DATABASE": env_vars.get("CHROMA_DATABASE"),
-        "CHROMA_DATA_DIR": env_vars.get("CHROMA_DATA_DIR"),
-        "CHROMA_EMBEDDING_FUNCTION": env_vars.get("CHROMA_EMBEDDING_FUNCTION"),
-        "OPENAI_API_KEY": env_vars.get("OPENAI_API_KEY"),
-        "CHROMA_OPENAI_EMBEDDING_MODEL": env_vars.get("CHROMA_OPENAI_EMBEDDING_MODEL"),
-        "CHROMA_OPENAI_EMBEDDING_DIMENSIONS": env_vars.get("CHROMA_OPENAI_EMBEDDING_DIMENSIONS"),
-    }
-    
-    return {k: v for k, v in relevant_vars.items() if v is not None}
+def validate_mcp_config(mcp_config: Any) -> Optional[str]:
+    """
+    Comprueba la estructura mcpServers.chroma.env del mcp.json una sola vez tras
+    leerlo. Retorna None si es válida o la descripción del problema.
+    """
+    node = mcp_config
+    path = "raíz"
+    for key in ("mcpServers", "chroma", "env"):
+        if not isinstance(node, dict):
+            return f"'{path}' debe ser un objeto"
+        if key not in node:
+            return f"falta '{key}' en '{path}'"
+        node = node[key]
+        path = key if path == "raíz" else f"{path}.{key}"
+    if not isinstance(node, dict):
+        return "'mcpServers.chroma.env' debe ser un objeto"
+    # Solo se comprueban las variables que usa este script, y se aceptan
+    # escalares JSON: un mcp.json editado a mano con "CHROMA_PORT": 8000 o
+    # "CHROMA_SSL": true sigue funcionando (se convierten a string al extraerlas)
+    for key in RELEVANT_ENV_VARS:
+        if isinstance(node.get(key), (dict, list)):
+            return f"'mcpServers.chroma.env.{key}' debe ser un valor simple"
+    return None
+
+# Dimensiones obtenidas al embeber un texto de prueba, por (id(ef), texto). El
+# valor guarda también el ef para que su id no se reutilice mientras siga aquí
+_PROBE_CACHE: Dict[Tuple[int, str], Tuple[Any, Optional[int]]] = {}
+
+def _probe_dimensions(ef, text: str) -> Optional[int]:
+    """Embebe text una sola vez por embedding function y retorna sus dimensiones."""
+    key = (id(ef), text)
+    cached = _PROBE_CACHE.get(key)
+    if cached is not None:
+        return cached[1]
+    embeddings = ef([text])
+    dimensions = len(embeddings[0]) if embeddings is not None and len(embeddings) > 0 else None
+    _PROBE_CACHE[key] = (ef, dimensions)
+    return dimensions
 
 def verify_embedding_function(ef, expected_dimensions: Optional[int] = None) -> tuple[bool, int, Optional[str]]:
     """Verifica el embedding function y retorna (is_valid, dimensions, error_message)."""
+    # Si el embedding function declara sus dimensiones (OpenAIEmbeddingFunction
+    # guarda las que se le pidieron) y coinciden con las esperadas, se confía en
+    # ellas y se evita la llamada de prueba, que con OpenAI es una petición facturada
+    declared = getattr(ef, "dimensions", None) or getattr(ef, "_dimensions", None)
+    if isinstance(declared, int) and (not expected_dimensions or declared == expected_dimensions):
+        return True, declared, None
+    
     try:
         # Probar con un texto de prueba
-        test_text = "test"
-        test_embedding = ef([test_text])
+        dimensions = _probe_dimensions(ef, "test")
         
-        if not test_embedding or len(test_embedding) == 0:
+        if dimensions is None:
             return False, 0, "El embedding function no generó embeddings"
         
-        dimensions = len(test_embedding[0])
-        
         if expected_dimensions and dimensions != expected_dimensions:
             return False, dimensions, f"Dimensiones incorrectas: esperado {expected_dimensions}, actual {dimensions}"
         
@@ -169,6 +132,79 @@ def verify_embedding_function(ef, expected_dimensions: Optional[int] = None) ->
     except Exception as e:
         return False, 0, f"Error al verificar embedding function: {e}"
 
+# Documentos por página al recorrer una colección para verificar dimensiones.
+# Cada página trae page_size x dimensiones floats: con 1536 dimensiones, 1000
+# documentos son ~6 MB en memoria (y bastante más como JSON en la respuesta)
+DEFAULT_VERIFY_PAGE_SIZE = 1000
+
+def iter_collection_pages(collection, include: List[str], page_size: int = DEFAULT_VERIFY_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Recorre una colección con get(limit, offset) y retorna cada página por separado."""
+    offset = 0
+    while True:
+        page = collection.get(include=include, limit=page_size, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            return
+        yield page
+        offset += len(ids)
+
+def embedding_dimensions(embeddings):
+    """
+    Retorna un array de numpy con las dimensiones de cada embedding de una
+    página (-1 si el embedding falta). Con chromadb>=1.0 la página ya es un
+    ndarray (N, D) y la dimensión sale de shape sin recorrer las filas; si es
+    una lista, las longitudes se calculan con np.fromiter.
+    """
+    # numpy llega con chromadb; se importa aquí para que --help no lo necesite
+    import numpy as np
+    
+    if isinstance(embeddings, np.ndarray) and embeddings.ndim == 2:
+        return np.full(embeddings.shape[0], embeddings.shape[1], dtype=np.int64)
+    return np.fromiter(
+        (-1 if embedding is None else len(embedding) for embedding in embeddings),
+        dtype=np.int64,
+        count=len(embeddings),
+    )
+
+# Tamaño de lote por defecto para borrar documentos por IDs
+DEFAULT_DELETE_BATCH_SIZE = 1000
+
+# Borrados en paralelo contra un servidor http/cloud: cada lote es una petición
+# de red, así que varias en vuelo solapan la latencia
+DEFAULT_DELETE_WORKERS = 8
+
+def _is_batch_too_big_error(error: Exception) -> bool:
+    """Indica si el servidor rechazó un borrado por ser demasiado grande."""
+    error_str = str(error).lower()
+    return "too big" in error_str or "too large" in error_str or "413" in error_str
+
+def delete_ids_in_batches(collection, coll_name: str, ids: List[str], batch_size: int, max_workers: int = 1) -> int:
+    """
+    Borra los IDs por lotes de batch_size, con hasta max_workers peticiones en
+    vuelo a la vez, y retorna cuántos se borraron. Si el servidor rechaza un
+    lote por tamaño, ese lote se reintenta partido en dos mitades.
+    """
+    batches = [ids[i:i+batch_size] for i in range(0, len(ids), batch_size)]
+    deleted = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(collection.delete, ids=batch_ids): batch_ids for batch_ids in batches}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch_ids = pending.pop(future)
+                try:
+                    future.result()
+                    deleted += len(batch_ids)
+                except Exception as e:
+                    if len(batch_ids) > 1 and _is_batch_too_big_error(e):
+                        half = len(batch_ids) // 2
+                        print(f"  ⚠️  Lote demasiado grande para {coll_name}, reintentando con lotes de {half}")
+                        for part in (batch_ids[:half], batch_ids[half:]):
+                            pending[executor.submit(collection.delete, ids=part)] = part
+                        continue
+                    print(f"  ⚠️  Error al eliminar lote de {coll_name}: {e}")
+    return deleted
+
 def main():
     """Función principal."""
     parser = argparse.ArgumentParser(
@@ -180,6 +216,18 @@ def main():
         type=str,
         help="Ruta del proyecto a verificar (si no se proporciona, se pregunta interactivamente)"
     )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=int(os.environ.get("CHROMA_VERIFY_PAGE_SIZE", DEFAULT_VERIFY_PAGE_SIZE)),
+        help=f"Documentos por página al verificar dimensiones (por defecto: CHROMA_VERIFY_PAGE_SIZE o {DEFAULT_VERIFY_PAGE_SIZE})"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=int(os.environ.get("CHROMA_DELETE_BATCH_SIZE", DEFAULT_DELETE_BATCH_SIZE)),
+        help=f"IDs por petición al eliminar documentos con dimensiones incorrectas (por defecto: CHROMA_DELETE_BATCH_SIZE o {DEFAULT_DELETE_BATCH_SIZE})"
+    )
     
     args = parser.parse_args()
     
@@ -193,9 +241,13 @@ def main():
     mcp_json_path = project_path / ".cursor" / "mcp.json"
     print(f"📖 Leyendo configuración desde {mcp_json_path}...")
     mcp_config = read_mcp_json(mcp_json_path)
+    error = validate_mcp_config(mcp_config)
+    if error:
+        print(f"❌ {mcp_json_path} no es válido: {error}", file=sys.stderr)
+        sys.exit(1)
     
     # Extraer variables de entorno del mcp.json
-    env_vars = get_chroma_env_vars_from_mcp_json(mcp_config)
+    env_vars = get_chroma_env_vars_from_mcp_json(mcp_config, RELEVANT_ENV_VARS)
     
     # Mostrar configuración esperada
     print("\n📋 Configuración esperada del mcp.json:")
@@ -227,7 +279,7 @@ def main():
             host=env_vars.get("CHROMA_HOST"),
             port=env_vars.get("CHROMA_PORT"),
             client_type=env_vars.get("CHROMA_CLIENT_TYPE"),
-            ssl=env_vars.get("CHROMA_SSL", "false").lower() in ["true", "1", "yes"],
+            ssl=bool(_parse_bool(env_vars.get("CHROMA_SSL"))),
             api_key=env_vars.get("CHROMA_API_KEY"),
             data_dir=env_vars.get("CHROMA_DATA_DIR"),
             embedding_function=env_vars.get("CHROMA_EMBEDDING_FUNCTION"),
@@ -270,45 +322,58 @@ def main():
         
         all_ok = True
         documents_to_delete = {}  # {collection_name: [list of ids]}
+        # Colecciones en las que sobran todos los documentos: se borran y recrean en
+        # el servidor en lugar de enumerar sus IDs {collection_name: (count, metadata)}
+        collections_to_recreate = {}
+        # Colecciones ya obtenidas en la verificación, para reutilizarlas al borrar
+        found_collections = {}
         
         for coll_name in collections_to_check:
             try:
                 # Intentar obtener la colección con el embedding function correcto
                 collection = client.get_collection(name=coll_name, embedding_function=ef)
+                found_collections[coll_name] = collection
                 count = collection.count()
                 
-                # Verificar dimensiones si hay documentos
-                if count > 0:
+                # Verificar dimensiones si hay documentos y una dimensión esperada
+                # con la que compararlos; sin ella, descargar los embeddings no
+                # aporta nada
+                if count > 0 and expected_dimensions is None:
+                    print(f"  ✅ {coll_name}: {count} documentos (sin dimensión esperada, no se verifican)")
+                elif count > 0:
                     try:
-                        # Obtener todos los documentos para verificar dimensiones
-                        all_data = collection.get(include=["embeddings"])
+                        # Recorrer los documentos por páginas para verificar dimensiones:
+                        # solo hay en memoria los embeddings de una página a la vez
+                        incorrect_ids = []
+                        correct_count = 0
+                        sample_dimensions = None
                         
-                        if all_data and "embeddings" in all_data and len(all_data["embeddings"]) > 0:
-                            incorrect_ids = []
-                            correct_count = 0
+                        for page in iter_collection_pages(collection, include=["embeddings"], page_size=args.page_size):
+                            embeddings = page.get("embeddings")
+                            if embeddings is None:
+                                continue
                             
-                            # Verificar cada documento
-                            for i, embedding in enumerate(all_data["embeddings"]):
-                                if embedding is None:
-                                    continue
-                                    
-                                doc_dimensions = len(embedding)
-                                
-                                if expected_dimensions and doc_dimensions != expected_dimensions:
-                                    # Documento con dimensiones incorrectas
-                                    doc_id = all_data["ids"][i]
-                                    incorrect_ids.append(doc_id)
-                                else:
-                                    correct_count += 1
+                            # Verificar la página entera de una vez con numpy
+                            dims = embedding_dimensions(embeddings)
+                            present = dims >= 0
+                            if sample_dimensions is None and present.any():
+                                sample_dimensions = int(dims[present.argmax()])
                             
-                            if incorrect_ids:
-                                print(f"  ⚠️  {coll_name}: {count} documentos - {len(incorrect_ids)} con dimensiones incorrectas, {correct_count} correctos")
-                                documents_to_delete[coll_name] = incorrect_ids
-                                all_ok = False
+                            if expected_dimensions:
+                                # Documentos con dimensiones incorrectas
+                                wrong = present & (dims != expected_dimensions)
+                                page_ids = page["ids"]
+                                incorrect_ids.extend(page_ids[i] for i in wrong.nonzero()[0])
+                                correct_count += int(present.sum()) - int(wrong.sum())
                             else:
-                                # Verificar dimensiones de muestra para mostrar
-                                sample_dimensions = len(all_data["embeddings"][0])
-                                print(f"  ✅ {coll_name}: {count} documentos - Dimensiones correctas ({sample_dimensions})")
+                                correct_count += int(present.sum())
+                        
+                        if incorrect_ids:
+                            print(f"  ⚠️  {coll_name}: {count} documentos - {len(incorrect_ids)} con dimensiones incorrectas, {correct_count} correctos")
+                            documents_to_delete[coll_name] = incorrect_ids
+                            all_ok = False
+                        elif sample_dimensions is not None:
+                            print(f"  ✅ {coll_name}: {count} documentos - Dimensiones correctas ({sample_dimensions})")
                         else:
                             print(f"  ✅ {coll_name}: {count} documentos")
                     except Exception as e:
@@ -327,10 +392,7 @@ def main():
                         count = collection_no_ef.count()
                         if count > 0:
                             print(f"     La colección tiene {count} documentos que necesitan ser eliminados")
-                            # Obtener todos los IDs para eliminarlos
-                            all_data = collection_no_ef.get()
-                            if all_data and "ids" in all_data:
-                                documents_to_delete[coll_name] = all_data["ids"]
+                            collections_to_recreate[coll_name] = (count, collection_no_ef.metadata)
                     except Exception as inner_e:
                         print(f"     ⚠️  No se pudieron obtener los documentos para eliminar: {inner_e}")
                     all_ok = False
@@ -341,34 +403,41 @@ def main():
                     all_ok = False
         
         # Eliminar documentos con dimensiones incorrectas
-        if documents_to_delete:
+        if documents_to_delete or collections_to_recreate:
             print()
             print("🗑️  Eliminando documentos con dimensiones incorrectas...")
             total_deleted = 0
+            # Con un cliente local (persistent/ephemeral) no hay red que solapar
+            # y SQLite serializa las escrituras: se borra secuencialmente
+            if env_vars.get("CHROMA_CLIENT_TYPE") in ("http", "cloud"):
+                delete_workers = DEFAULT_DELETE_WORKERS
+            else:
+                delete_workers = 1
+            
+            # Si hay que eliminar todos los documentos, delete_collection los borra en
+            # el servidor con una sola operación; la colección se recrea vacía con sus
+            # metadatos y el embedding function correcto
+            for coll_name, (delete_count, metadata) in collections_to_recreate.items():
+                try:
+                    client.delete_collection(name=coll_name)
+                    client.create_collection(name=coll_name, metadata=metadata or None, embedding_function=ef)
+                    print(f"  ✅ {coll_name}: {delete_count} documentos eliminados (colección recreada)")
+                    total_deleted += delete_count
+                except Exception as e:
+                    print(f"  ❌ Error al recrear {coll_name}: {e}")
             
             for coll_name, ids_to_delete in documents_to_delete.items():
                 try:
-                    # Intentar obtener la colección con el embedding function correcto
-                    # Si falla, intentar sin embedding function
-                    try:
-                        collection = client.get_collection(name=coll_name, embedding_function=ef)
-                    except Exception:
-                        # Si falla por dimensiones, obtener sin embedding function
-                        collection = client.get_collection(name=coll_name)
+                    # Reutilizar la colección obtenida durante la verificación: solo
+                    # hay IDs que borrar si get_collection funcionó en ese momento
+                    collection = found_collections.get(coll_name) or client.get_collection(name=coll_name)
                     
                     delete_count = len(ids_to_delete)
                     
                     # Eliminar por lotes para evitar problemas con grandes cantidades
-                    batch_size = 100
-                    deleted_in_collection = 0
-                    
-                    for i in range(0, len(ids_to_delete), batch_size):
-                        batch_ids = ids_to_delete[i:i+batch_size]
-                        try:
-                            collection.delete(ids=batch_ids)
-                            deleted_in_collection += len(batch_ids)
-                        except Exception as e:
-                            print(f"  ⚠️  Error al eliminar lote de {coll_name}: {e}")
+                    deleted_in_collection = delete_ids_in_batches(
+                        collection, coll_name, ids_to_delete, args.batch_size, delete_workers
+                    )
                     
                     if deleted_in_collection > 0:
                         print(f"  ✅ {coll_name}: {deleted_in_collection} documentos eliminados")
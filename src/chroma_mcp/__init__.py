@@ -1,23 +1,45 @@
 """Chroma MCP Server Package."""
 
-# Import key types for easier access, but be careful about circular dependencies
-from .types import (
-    # Document, # Removed: Not defined in types.py
-    DocumentMetadata,
-    # QueryResult, # Removed: Not defined in types.py
-    ThoughtMetadata,
-)
-from .utils import (
-    chroma_client,
-    config,
-    errors,
-)
-
-from .tools import collection_tools, document_tools, thinking_tools
-
-# Import key components for easier access from outside
-from .utils import get_logger, get_chroma_client, get_embedding_function
-from .utils.errors import McpError, ValidationError  # Assuming McpError is defined here or imported
+import importlib
+
+# Key types, utils and tools are re-exported for easier access, but resolved
+# lazily (PEP 562): importing any submodule (e.g. chroma_mcp.cli for --help or
+# --version) must not pull in chromadb and the embedding libraries.
+# Maps each public name to (module, attribute); attribute None means the module itself.
+_LAZY_ATTRS = {
+    # Types
+    "DocumentMetadata": (".types", "DocumentMetadata"),
+    "ThoughtMetadata": (".types", "ThoughtMetadata"),
+    # Utils
+    "chroma_client": (".utils.chroma_client", None),
+    "config": (".utils.config", None),
+    "errors": (".utils.errors", None),
+    "get_logger": (".utils", "get_logger"),
+    "get_chroma_client": (".utils", "get_chroma_client"),
+    "get_embedding_function": (".utils", "get_embedding_function"),
+    "McpError": (".utils.errors", "McpError"),
+    "ValidationError": (".utils.errors", "ValidationError"),
+    # Tools
+    "collection_tools": (".tools.collection_tools", None),
+    "document_tools": (".tools.document_tools", None),
+    "thinking_tools": (".tools.thinking_tools", None),
+}
+
+
+def __getattr__(name):
+    try:
+        module_name, attr = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    module = importlib.import_module(module_name, __name__)
+    value = module if attr is None else getattr(module, attr)
+    globals()[name] = value  # Cache so __getattr__ is only hit once per name
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __version__ = "0.1.0"
 
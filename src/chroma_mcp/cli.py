@@ -22,11 +22,54 @@ if "PYTORCH_CUDA_ALLOC_CONF" in os.environ and "PYTORCH_ALLOC_CONF" not in os.en
     # Optionally remove the deprecated variable to avoid confusion
     # os.environ.pop("PYTORCH_CUDA_ALLOC_CONF", None)
 
-# Import app module to access main_stdio
-from chroma_mcp import app
+# chroma_mcp.server and chroma_mcp.app are imported inside main(): they pull in
+# chromadb and the embedding libraries, which --help, --version and argument
+# errors never need.
 
-# Import server functions needed for HTTP mode at the top level
-from chroma_mcp.server import config_server, main as server_main, _initialize_chroma_client
+
+def _compute_version() -> str:
+    """Returns the package version, falling back to pyproject.toml or a dev default."""
+    # Try to get version from installed package, fallback to pyproject.toml or default
+    try:
+        return importlib.metadata.version("chroma-mcp-server")
+    except importlib.metadata.PackageNotFoundError:
+        pass
+    # Fallback: try to read from pyproject.toml
+    try:
+        # Use tomllib (Python 3.11+) or fallback to tomli
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib
+        pyproject_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "pyproject.toml")
+        if os.path.exists(pyproject_path):
+            with open(pyproject_path, "rb") as f:
+                pyproject = tomllib.load(f)
+                return pyproject.get("project", {}).get("version", "0.0.0-dev")
+        return "0.0.0-dev"
+    except Exception:
+        return "0.0.0-dev"
+
+
+class _LazyVersionAction(argparse.Action):
+    """Version action that resolves the version only when --version is given.
+
+    Normal startups (including --help and stdio spawns from MCP clients) skip
+    the importlib.metadata scan entirely.
+    """
+
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help=None):
+        super().__init__(
+            option_strings=option_strings,
+            dest=dest,
+            default=default,
+            nargs=0,
+            help=help or "show program's version number and exit",
+        )
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        print(f"{parser.prog} {_compute_version()}")
+        parser.exit()
 
 
 def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
@@ -54,29 +97,7 @@ def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
         default=os.getenv("CHROMA_SERVER_MODE", "http"),
         help="Server mode: 'stdio' for stdio transport, 'http' for default HTTP server (or set CHROMA_SERVER_MODE).",
     )
-    # Try to get version from installed package, fallback to pyproject.toml or default
-    try:
-        version_str = importlib.metadata.version("chroma-mcp-server")
-    except importlib.metadata.PackageNotFoundError:
-        # Fallback: try to read from pyproject.toml
-        try:
-            # Use tomllib (Python 3.11+) or fallback to tomli
-            try:
-                import tomllib
-            except ImportError:
-                import tomli as tomllib
-            pyproject_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "pyproject.toml")
-            if os.path.exists(pyproject_path):
-                with open(pyproject_path, "rb") as f:
-                    pyproject = tomllib.load(f)
-                    version_str = pyproject.get("project", {}).get("version", "0.0.0-dev")
-            else:
-                version_str = "0.0.0-dev"
-        except Exception:
-            version_str = "0.0.0-dev"
-    parser.add_argument(
-        "--version", action="version", version=f'%(prog)s {version_str}'
-    )  # Add version flag
+    parser.add_argument("--version", action=_LazyVersionAction)  # Add version flag
 
     # Client configuration
     parser.add_argument(
@@ -169,46 +190,35 @@ def main() -> int:
 
     try:
         if args.mode == "stdio":
-            # Initialize the Chroma client first!
+            from chroma_mcp import app
+            from chroma_mcp import utils as chroma_utils
+            from chroma_mcp.server import _initialize_chroma_client
+
             # In stdio mode, we should NOT write to stderr as it can corrupt the JSON protocol
-            # The logger will record these messages in log files
-            try:
-                from chroma_mcp.utils import get_logger, _main_logger_instance
-                if _main_logger_instance is not None:
-                    logger = get_logger("cli")
-                    logger.info("Initializing Chroma client for stdio mode...")
-            except Exception:
-                # Logger not configured yet, but we still don't print to stderr in stdio mode
-                pass
+            # The logger will record these messages in log files, once it is configured.
+            # _main_logger_instance is read on every call: it may be set while the server runs.
+            def _log(message: str) -> None:
+                if chroma_utils._main_logger_instance is not None:
+                    chroma_utils.get_logger("cli").info(message)
+
+            # Initialize the Chroma client first!
+            _log("Initializing Chroma client for stdio mode...")
             
             _initialize_chroma_client(args)
             
-            try:
-                from chroma_mcp.utils import get_logger, _main_logger_instance
-                if _main_logger_instance is not None:
-                    logger = get_logger("cli")
-                    logger.info("Chroma client initialized. Starting server in stdio mode...")
-            except Exception:
-                # Logger not configured yet, but we still don't print to stderr in stdio mode
-                pass
+            _log("Chroma client initialized. Starting server in stdio mode...")
             
             # Run the stdio server
             asyncio.run(app.main_stdio())
             
-            try:
-                from chroma_mcp.utils import get_logger, _main_logger_instance
-                if _main_logger_instance is not None:
-                    logger = get_logger("cli")
-                    logger.info("Stdio server finished.")
-            except Exception:
-                # Logger not configured yet, but we still don't print to stderr in stdio mode
-                pass
+            _log("Stdio server finished.")
             # stdio mode might finish normally, so return 0
             return 0
         else:  # Default HTTP mode
             # Run the default (HTTP) server
             print("Starting server in default (HTTP) mode...", file=sys.stderr)
-            # Imports moved to top level
+            from chroma_mcp.server import config_server, main as server_main
+
             # Configure server first
             config_server(args)  # Pass parsed args
             # Now run the server main loop
@@ -7,6 +7,7 @@ sin modificar el código core del servidor.
 
 import os
 import logging
+from functools import lru_cache
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,21 @@ except ImportError:
     # No loguear warning aquí para evitar spam, solo cuando se intente usar
 
 
+@lru_cache(maxsize=1)
+def _get_session() -> "requests.Session":
+    """
+    Retorna una sesión HTTP compartida con keep-alive.
+
+    Las comprobaciones de tenant y base de datos se hacen contra el mismo servidor,
+    así que reutilizar la conexión evita un handshake TCP/TLS por petición.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 def ensure_tenant_exists(
     host: str,
     port: int,
@@ -71,7 +87,7 @@ def ensure_tenant_exists(
         if verbose:
             logger.info(f"Verificando tenant '{tenant}'...")
         
-        response = requests.get(check_url, headers=headers, timeout=5)
+        response = _get_session().get(check_url, headers=headers, timeout=5)
         status_code = response.status_code
         
         if verbose:
@@ -89,7 +105,7 @@ def ensure_tenant_exists(
             create_url = f"{base_url}/api/v2/tenants"
             create_data = {"name": tenant}
             
-            create_response = requests.post(
+            create_response = _get_session().post(
                 create_url,
                 headers=headers,
                 json=create_data,
@@ -188,7 +204,7 @@ def ensure_database_exists(
         if verbose:
             logger.info(f"Verificando base de datos '{database}' en tenant '{tenant}'...")
         
-        response = requests.get(check_url, headers=headers, timeout=5)
+        response = _get_session().get(check_url, headers=headers, timeout=5)
         status_code = response.status_code
         
         if verbose:
@@ -206,7 +222,7 @@ def ensure_database_exists(
             create_url = f"{base_url}/api/v2/tenants/{tenant}/databases"
             create_data = {"name": database}
             
-            create_response = requests.post(
+            create_response = _get_session().post(
                 create_url,
                 headers=headers,
                 json=create_data,
@@ -278,7 +294,7 @@ def verify_database_access(
     check_url = f"{base_url}/api/v2/tenants/{tenant}/databases/{database}"
     
     try:
-        response = requests.get(check_url, headers=headers, timeout=5)
+        response = _get_session().get(check_url, headers=headers, timeout=5)
         return response.status_code == 200
     except Exception:
         return False
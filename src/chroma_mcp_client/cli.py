@@ -118,6 +118,24 @@ def main():
         help="Name of the ChromaDB collection to use.",
     )
 
+    # --- Index Stdin Subparser ---
+    index_stdin_parser = subparsers.add_parser(
+        "index-stdin",
+        help="Index file paths read from stdin (one per line), answering one status line per path.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    index_stdin_parser.add_argument(
+        "--repo-root",
+        type=Path,
+        default=Path(os.getcwd()),
+        help="Repository root path (relative paths are resolved against it and it is used for IDs).",
+    )
+    index_stdin_parser.add_argument(
+        "--collection-name",
+        default=DEFAULT_COLLECTION_NAME,
+        help="Name of the ChromaDB collection to use.",
+    )
+
     # --- Count Subparser ---
     count_parser = subparsers.add_parser("count", help="Count documents in a ChromaDB collection.")
     count_parser.add_argument(
@@ -648,6 +666,33 @@ def main():
         else:
             logger.warning("Index command called without --all flag or specific paths. Nothing to index.")
 
+    elif args.command == "index-stdin":
+        # Long-running worker: the interpreter, chromadb and the embedding function are
+        # loaded once and then every path read from stdin is indexed. Each path gets
+        # exactly one "<status>\t<path>" line on stdout (status: ok, skipped, error),
+        # flushed immediately so the caller can drive it line by line.
+        collection_name = args.collection_name
+        repo_root_path = args.repo_root.resolve()
+        logger.info(f"Executing 'index-stdin' command for collection '{collection_name}'...")
+        indexed_count = 0
+        for line in sys.stdin:
+            path_str = line.rstrip("\r\n")
+            if not path_str:
+                continue
+            path_item = repo_root_path / path_str  # Absolute paths are kept as-is
+            try:
+                if path_item.is_file() and index_file(path_item, repo_root_path, collection_name):
+                    status = "ok"
+                    indexed_count += 1
+                else:
+                    status = "skipped"
+            except Exception as e:
+                logger.error(f"Failed to index {path_item}: {e}", exc_info=True)
+                status = "error"
+            sys.stdout.write(f"{status}\t{path_str}\n")
+            sys.stdout.flush()
+        logger.info(f"Stdin index command finished. Indexed {indexed_count} files.")
+
     elif args.command == "count":
         collection_name = args.collection_name
         logger.info(f"Executing 'count' command for collection '{collection_name}'...")
@@ -263,6 +263,40 @@ def test_index_all_files(mock_index_git, mock_get_client_ef, mock_argparse, test
     mock_index_git.assert_called_once_with(test_dir, collection_name)
 
 
+@patch("argparse.ArgumentParser")
+@patch("chroma_mcp_client.cli.get_client_and_ef")
+@patch("chroma_mcp_client.cli.index_file")
+def test_index_stdin(mock_index_file, mock_get_client_ef, mock_argparse, test_dir, capsys, monkeypatch):
+    """Test indexing paths read from stdin, one status line per path."""
+    mock_client_instance = MagicMock(spec=chromadb.ClientAPI)
+    mock_get_client_ef.return_value = (mock_client_instance, DefaultEmbeddingFunction())
+    # file1.py is indexed, file2.md is rejected by index_file, missing.py does not exist
+    mock_index_file.side_effect = lambda path, root, name: path.name == "file1.py"
+
+    collection_name = "stdin_collection"
+    monkeypatch.setattr(sys, "stdin", StringIO("file1.py\nfile2.md\n\nmissing.py\n"))
+
+    mock_parser_instance = mock_argparse.return_value
+    mock_args = create_mock_args(
+        command="index-stdin",
+        verbose=0,
+        repo_root=test_dir,
+        collection_name=collection_name,
+    )
+    mock_parser_instance.parse_args.return_value = mock_args
+
+    # Run CLI
+    main()
+
+    # Assertions
+    assert mock_index_file.call_args_list == [
+        call(test_dir / "file1.py", test_dir, collection_name),
+        call(test_dir / "file2.md", test_dir, collection_name),
+    ]
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == ["ok\tfile1.py", "skipped\tfile2.md", "skipped\tmissing.py"]
+
+
 # =====================================================================
 # Tests for Count
 # =====================================================================
@@ -0,0 +1,36 @@
+"""
+Fixtures for the tests of the standalone scripts in scripts/propios.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+PROPIOS_DIR = Path(__file__).resolve().parents[2] / "scripts" / "propios"
+
+
+@pytest.fixture(scope="session")
+def load_propios_script():
+    """Return a loader for scripts/propios modules.
+
+    The scripts are not a package and several have hyphenated names
+    (index-project.py), so they are loaded from their file path. Each script
+    is loaded once per session.
+    """
+    # The scripts import their shared helpers with "from _common import ..."
+    if str(PROPIOS_DIR) not in sys.path:
+        sys.path.insert(0, str(PROPIOS_DIR))
+    loaded = {}
+
+    def _load(filename: str):
+        if filename not in loaded:
+            module_name = "propios_" + Path(filename).stem.replace("-", "_")
+            spec = importlib.util.spec_from_file_location(module_name, PROPIOS_DIR / filename)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            loaded[filename] = module
+        return loaded[filename]
+
+    return _load
@@ -0,0 +1,74 @@
+"""
+Unit tests for remove_chroma_from_mcp_json in scripts/propios/clean-project.py.
+"""
+
+import json
+import os
+import stat
+
+import pytest
+
+MCP_CONFIG = {
+    "mcpServers": {
+        "chroma": {"command": "chroma-mcp-server", "env": {"CHROMA_CLIENT_TYPE": "http"}},
+        "other": {"command": "other-server"},
+    },
+    "extra": {"keep": True},
+}
+
+
+@pytest.fixture(scope="module")
+def clean_project(load_propios_script):
+    return load_propios_script("clean-project.py")
+
+
+@pytest.fixture
+def mcp_json(tmp_path):
+    path = tmp_path / "mcp.json"
+    path.write_text(json.dumps(MCP_CONFIG))
+    return path
+
+
+class TestRemoveChromaFromMcpJson:
+    """Test cases for remove_chroma_from_mcp_json."""
+
+    def test_removes_only_the_chroma_entry(self, clean_project, mcp_json):
+        assert clean_project.remove_chroma_from_mcp_json(mcp_json) is True
+        assert json.loads(mcp_json.read_text()) == {
+            "mcpServers": {"other": {"command": "other-server"}},
+            "extra": {"keep": True},
+        }
+
+    def test_drops_empty_mcp_servers(self, clean_project, tmp_path):
+        path = tmp_path / "mcp.json"
+        path.write_text(json.dumps({"mcpServers": {"chroma": {}}}))
+        assert clean_project.remove_chroma_from_mcp_json(path) is True
+        assert json.loads(path.read_text()) == {}
+
+    def test_dry_run_leaves_the_file_untouched(self, clean_project, mcp_json, capsys):
+        before = mcp_json.read_bytes()
+        assert clean_project.remove_chroma_from_mcp_json(mcp_json, dry_run=True) is True
+        assert mcp_json.read_bytes() == before
+        assert '"other"' in capsys.readouterr().out
+        assert os.listdir(mcp_json.parent) == ["mcp.json"]
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+    def test_keeps_the_file_mode(self, clean_project, mcp_json):
+        os.chmod(mcp_json, 0o600)
+        assert clean_project.remove_chroma_from_mcp_json(mcp_json) is True
+        assert stat.S_IMODE(os.stat(mcp_json).st_mode) == 0o600
+        assert os.listdir(mcp_json.parent) == ["mcp.json"]
+
+    def test_failed_write_keeps_the_original_and_removes_the_temp_file(self, clean_project, mcp_json, monkeypatch):
+        before = mcp_json.read_bytes()
+
+        def _fail(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(clean_project.os, "replace", _fail)
+        assert clean_project.remove_chroma_from_mcp_json(mcp_json) is False
+        assert mcp_json.read_bytes() == before
+        assert os.listdir(mcp_json.parent) == ["mcp.json"]
+
+    def test_missing_file_is_skipped(self, clean_project, tmp_path):
+        assert clean_project.remove_chroma_from_mcp_json(tmp_path / "mcp.json") is True
@@ -0,0 +1,160 @@
+"""
+Unit tests for the shared helpers in scripts/propios/_common.py.
+"""
+
+import argparse
+import sys
+import threading
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def common(load_propios_script):
+    return load_propios_script("_common.py")
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--project-path")
+    parser.add_argument("--tenant")
+    parser.add_argument("--force", action="store_true")
+    return parser
+
+
+def _parse(common, argv):
+    return common.parse_simple_argv(argv, ("--project-path", "--tenant"), ("--force",), _build_parser)
+
+
+class TestParseSimpleArgv:
+    """Test cases for parse_simple_argv."""
+
+    def test_defaults(self, common):
+        args = _parse(common, [])
+        assert args.project_path is None
+        assert args.tenant is None
+        assert args.force is False
+
+    def test_separate_and_inline_values(self, common):
+        args = _parse(common, ["--project-path", "/tmp/p", "--tenant=acme", "--force"])
+        assert args.project_path == "/tmp/p"
+        assert args.tenant == "acme"
+        assert args.force is True
+
+    def test_inline_value_may_contain_equals(self, common):
+        assert _parse(common, ["--tenant=a=b"]).tenant == "a=b"
+
+    def test_last_occurrence_wins(self, common):
+        assert _parse(common, ["--tenant", "a", "--tenant", "b"]).tenant == "b"
+
+    def test_argparse_is_not_built_for_simple_cases(self, common):
+        def _fail():
+            raise AssertionError("argparse fallback should not be used")
+
+        args = common.parse_simple_argv(["--tenant", "x"], ("--tenant",), (), _fail)
+        assert args.tenant == "x"
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ["--unknown"],  # Unknown flag
+            ["--tenant"],  # Missing value
+            ["positional"],
+        ],
+    )
+    def test_falls_back_to_argparse_errors(self, common, argv):
+        with pytest.raises(SystemExit) as exc_info:
+            _parse(common, argv)
+        assert exc_info.value.code == 2
+
+    def test_abbreviation_resolved_by_argparse(self, common):
+        # argparse accepts unambiguous prefixes; the fast path must not drop them
+        assert _parse(common, ["--project", "/tmp/p"]).project_path == "/tmp/p"
+
+    def test_help_falls_back_to_argparse(self, common, capsys):
+        with pytest.raises(SystemExit) as exc_info:
+            _parse(common, ["--help"])
+        assert exc_info.value.code == 0
+        assert "--project-path" in capsys.readouterr().out
+
+
+class TestGetChromaEnvVarsFromMcpJson:
+    """Test cases for get_chroma_env_vars_from_mcp_json."""
+
+    def test_scalars_become_strings(self, common):
+        env = {"CHROMA_PORT": 8000, "CHROMA_SSL": True, "CHROMA_HOST": "h", "CHROMA_TENANT": None}
+        assert common.get_chroma_env_vars_from_mcp_json({"mcpServers": {"chroma": {"env": env}}}) == {
+            "CHROMA_PORT": "8000",
+            "CHROMA_SSL": "true",
+            "CHROMA_HOST": "h",
+        }
+
+    def test_only_requested_keys(self, common):
+        env = {"CHROMA_HOST": "h", "UNRELATED": "x", "EXTRA": "y"}
+        config = {"mcpServers": {"chroma": {"env": env}}}
+        assert common.get_chroma_env_vars_from_mcp_json(config) == {"CHROMA_HOST": "h"}
+        assert common.get_chroma_env_vars_from_mcp_json(config, ("EXTRA",)) == {"EXTRA": "y"}
+
+    def test_missing_sections(self, common):
+        assert common.get_chroma_env_vars_from_mcp_json({}) == {}
+        assert common.get_chroma_env_vars_from_mcp_json({"mcpServers": {}}) == {}
+
+
+class TestRunStepsConcurrently:
+    """Test cases for run_steps_concurrently."""
+
+    def test_results_and_output_in_step_order(self, common, capsys):
+        first_may_finish = threading.Event()
+
+        def first():
+            # Finishes after the second step, but is still reported first
+            first_may_finish.wait(timeout=5)
+            print("first out")
+            print("first err", file=sys.stderr)
+            return 1
+
+        def second():
+            print("second out")
+            first_may_finish.set()
+            return 2
+
+        stdout_before, stderr_before = sys.stdout, sys.stderr
+        assert common.run_steps_concurrently([("Step 1", first), ("Step 2", second)], subtitle="sub") == [1, 2]
+        assert (sys.stdout, sys.stderr) == (stdout_before, stderr_before)
+
+        captured = capsys.readouterr()
+        assert captured.out.index("Step 1") < captured.out.index("first out") < captured.out.index("Step 2")
+        assert captured.out.index("Step 2") < captured.out.index("second out")
+        assert captured.out.count("sub\n") == 2
+        assert captured.err == "first err\n"
+
+    def test_failing_step_returns_false(self, common, capsys):
+        def boom():
+            print("before")
+            raise RuntimeError("kaput")
+
+        assert common.run_steps_concurrently([("Ok", lambda: True), ("Boom", boom)]) == [True, False]
+        captured = capsys.readouterr()
+        assert "before" in captured.out
+        assert "❌ Error inesperado: kaput" in captured.err
+
+    def test_streams_restored_when_a_step_escapes(self, common):
+        def interrupted():
+            raise KeyboardInterrupt
+
+        stdout_before, stderr_before = sys.stdout, sys.stderr
+        with pytest.raises(KeyboardInterrupt):
+            common.run_steps_concurrently([("Interrupted", interrupted)])
+        assert (sys.stdout, sys.stderr) == (stdout_before, stderr_before)
+
+    def test_other_threads_write_directly(self, common, capsys):
+        def step():
+            worker = threading.Thread(target=print, args=("from a plain thread",))
+            worker.start()
+            worker.join()
+            return True
+
+        common.run_steps_concurrently([("Step", step)])
+        out = capsys.readouterr().out
+        # Not buffered with the step output, so it appears before the title
+        assert out.index("from a plain thread") < out.index("Step")
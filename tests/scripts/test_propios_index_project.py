@@ -0,0 +1,235 @@
+"""
+Unit tests for the exclude-pattern matching and the directory walk in scripts/propios/index-project.py.
+"""
+
+import os
+import queue
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path("/project")
+
+
+@pytest.fixture(scope="module")
+def index_project(load_propios_script):
+    return load_propios_script("index-project.py")
+
+
+def _kept(index_project, rel_paths, patterns):
+    """Return the relative paths that survive filter_files_by_exclude."""
+    files = [ROOT / p for p in rel_paths]
+    return [str(f.relative_to(ROOT)) for f in index_project.filter_files_by_exclude(files, ROOT, patterns)]
+
+
+class TestSplitLiteralExcludePatterns:
+    """Test cases for split_literal_exclude_patterns."""
+
+    def test_plain_name_matches_at_any_depth(self, index_project):
+        exact, prefixes, suffixes, globs = index_project.split_literal_exclude_patterns(["build"])
+        assert exact == {"build"}
+        assert prefixes == ()
+        assert suffixes == ("/build",)
+        assert globs == []
+
+    def test_anchored_path_matches_itself_and_its_contents(self, index_project):
+        exact, prefixes, suffixes, globs = index_project.split_literal_exclude_patterns(["/dist"])
+        assert exact == {"dist"}
+        assert prefixes == ("dist/",)
+        assert suffixes == ()
+        assert globs == []
+
+    def test_anchored_directory_is_a_prefix_only(self, index_project):
+        exact, prefixes, _, _ = index_project.split_literal_exclude_patterns(["/out/"])
+        assert exact == set()
+        assert prefixes == ("out/",)
+
+    def test_directory_literal_is_left_to_the_dir_regex(self, index_project):
+        assert index_project.split_literal_exclude_patterns(["node_modules/"]) == (set(), (), (), [])
+
+    def test_wildcards_go_to_the_regex(self, index_project):
+        patterns = ["*.pyc", "file?.txt", "[ab].md", "docs/**"]
+        _, _, _, globs = index_project.split_literal_exclude_patterns(patterns)
+        assert globs == patterns
+
+    def test_backslashes_are_normalized(self, index_project):
+        exact, prefixes, _, _ = index_project.split_literal_exclude_patterns(["\\dist"])
+        assert exact == {"dist"}
+        assert prefixes == ("dist/",)
+
+
+class TestCompileExcludePatterns:
+    """Test cases for compile_exclude_patterns."""
+
+    def test_no_patterns_compiles_to_none(self, index_project):
+        assert index_project.compile_exclude_patterns([]) is None
+
+    @pytest.mark.parametrize(
+        "pattern, path, expected",
+        [
+            ("*.pyc", "a.pyc", True),
+            ("*.pyc", "pkg/sub/a.pyc", True),
+            ("*.pyc", "a.py", False),
+            ("/build", "build", True),
+            ("/build", "build/out.o", True),
+            ("/build", "src/build", False),
+            ("docs/*", "docs/index.md", True),
+            ("docs/*", "other/index.md", False),
+            ("**/tmp", "a/b/tmp", True),
+            ("secret.txt", "deep/dir/secret.txt", True),
+            ("secret.txt", "secret.txt.bak", False),
+        ],
+    )
+    def test_pattern_forms(self, index_project, pattern, path, expected):
+        regex = index_project.compile_exclude_patterns([pattern])
+        assert bool(regex.match(path)) is expected
+
+    def test_patterns_are_combined(self, index_project):
+        regex = index_project.compile_exclude_patterns(["*.log", "/tmp"])
+        assert regex.match("logs/app.log")
+        assert regex.match("tmp/x")
+        assert not regex.match("src/app.py")
+
+
+class TestFilterFilesByExclude:
+    """Test cases for filter_files_by_exclude."""
+
+    def test_no_patterns_keeps_everything(self, index_project):
+        assert _kept(index_project, ["a.py", "b/c.py"], []) == ["a.py", "b/c.py"]
+
+    def test_directory_pattern_excludes_files_inside(self, index_project):
+        # Patterns ending in '/' used to call is_dir() on each file and so never
+        # excluded anything; they now exclude everything under that directory
+        rel_paths = ["build/out.o", "src/build/gen.py", "build", "src/main.py"]
+        assert _kept(index_project, rel_paths, ["build/"]) == ["build", "src/main.py"]
+
+    def test_files_outside_the_project_are_kept(self, index_project):
+        files = [Path("/elsewhere/build/x.o")]
+        assert list(index_project.filter_files_by_exclude(files, ROOT, ["build/"])) == files
+
+    def test_literals_and_globs_together(self, index_project):
+        rel_paths = [".env", "app/.env", "dist/pkg.whl", "src/dist", "x.pyc", "src/app.py"]
+        patterns = [".env", "/dist", "*.pyc"]
+        assert _kept(index_project, rel_paths, patterns) == ["src/dist", "src/app.py"]
+
+    def test_plain_name_excludes_directories_at_any_depth(self, index_project):
+        rel_paths = ["node_modules/a.js", "web/node_modules/b.js", "web/app.js", "node_modules"]
+        assert _kept(index_project, rel_paths, ["node_modules"]) == ["web/app.js"]
+
+
+def _touch(root, *rel_paths):
+    for rel in rel_paths:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x")
+
+
+class TestWalkProjectFiles:
+    """Test cases for walk_project_files."""
+
+    def test_prunes_excluded_directories_and_git(self, index_project, tmp_path):
+        _touch(tmp_path, "main.py", "pkg/mod.py", "pkg/node_modules/x.js", ".venv/lib/site.py", ".git/HEAD", "dist/a.whl")
+        walked = index_project.walk_project_files(tmp_path, ["node_modules", ".venv", "/dist"])
+        assert sorted(p.relative_to(tmp_path).as_posix() for p in walked) == ["main.py", "pkg/mod.py"]
+
+
+class TestGetAllFilesInProjectFallback:
+    """Test cases for the directory walk used when git cannot list the files."""
+
+    def _files(self, index_project, root):
+        return sorted(p.relative_to(root).as_posix() for p in index_project.get_all_files_in_project(root))
+
+    def test_walks_when_not_a_git_repository(self, index_project, tmp_path, monkeypatch, capsys):
+        monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+        _touch(tmp_path, "main.py", "web/node_modules/b.js", ".venv/lib/site.py", "debug.log")
+        (tmp_path / ".gitignore").write_text("node_modules\n.venv\n*.log\n")
+        assert self._files(index_project, tmp_path) == [".gitignore", "main.py"]
+        assert "no es un repositorio git" in capsys.readouterr().err
+
+    def test_walks_when_git_is_missing(self, index_project, tmp_path, monkeypatch):
+        def _missing(*args, **kwargs):
+            raise FileNotFoundError("git")
+
+        monkeypatch.setattr(index_project.subprocess, "run", _missing)
+        _touch(tmp_path, "main.py", "build/out.o")
+        (tmp_path / ".gitignore").write_text("build\n")
+        assert self._files(index_project, tmp_path) == [".gitignore", "main.py"]
+
+    def test_other_git_failures_are_fatal(self, index_project, tmp_path, monkeypatch):
+        real_run = index_project.subprocess.run
+
+        def _run(cmd, *args, **kwargs):
+            if "ls-files" in cmd:
+                raise index_project.subprocess.CalledProcessError(128, cmd, stderr="fatal: detected dubious ownership")
+            return real_run(cmd, *args, **kwargs)
+
+        monkeypatch.setattr(index_project.subprocess, "run", _run)
+        index_project.subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+        _touch(tmp_path, "main.py")
+        with pytest.raises(SystemExit) as exc_info:
+            list(index_project.get_all_files_in_project(tmp_path))
+        assert exc_info.value.code == 1
+
+
+# Stand-in for 'chroma-mcp-client index-stdin': one status line per path, and
+# exits without answering when it reads "crash"
+FAKE_INDEX_STDIN = """
+import sys
+for line in sys.stdin:
+    path = line.rstrip("\\n")
+    if path == "crash":
+        sys.stderr.write("boom\\n")
+        sys.exit(1)
+    status = "skipped" if path.endswith(".bin") else "indexed"
+    print(f"{status}\\t{path}", flush=True)
+"""
+
+
+class TestIndexWorker:
+    """Test cases for the _index_worker index-stdin protocol."""
+
+    def _run(self, index_project, tmp_path, paths):
+        script = tmp_path / "fake_index_stdin.py"
+        script.write_text(FAKE_INDEX_STDIN)
+        results = queue.Queue()
+        stderr = index_project._index_worker(paths, [sys.executable, str(script)], tmp_path, dict(os.environ), results)
+        return [results.get_nowait() for _ in range(results.qsize())], stderr
+
+    def test_one_status_per_path(self, index_project, tmp_path):
+        results, stderr = self._run(index_project, tmp_path, ["a.py", "b.bin", "c/d.md"])
+        assert results == [("a.py", "indexed"), ("b.bin", "skipped"), ("c/d.md", "indexed")]
+        assert stderr == ""
+
+    def test_paths_with_newlines_are_not_sent(self, index_project, tmp_path):
+        results, _ = self._run(index_project, tmp_path, ["a.py", "bad\nname.py", "odd\rname.py", "b.py"])
+        assert results == [
+            ("a.py", "indexed"),
+            ("bad\nname.py", "error"),
+            ("odd\rname.py", "error"),
+            ("b.py", "indexed"),
+        ]
+
+    def test_early_exit_fails_the_remaining_paths(self, index_project, tmp_path):
+        results, stderr = self._run(index_project, tmp_path, ["a.py", "crash", "b.py", "c.py"])
+        assert results == [("a.py", "indexed"), ("crash", "error"), ("b.py", "error"), ("c.py", "error")]
+        assert "boom" in stderr
+
+    def test_command_that_cannot_start(self, index_project, tmp_path):
+        results = queue.Queue()
+        stderr = index_project._index_worker(["a.py", "b.py"], [str(tmp_path / "missing")], tmp_path, dict(os.environ), results)
+        assert [results.get_nowait() for _ in range(2)] == [("a.py", "error"), ("b.py", "error")]
+        assert stderr
+
+
+class TestJobsArgument:
+    """Test cases for the --jobs validation."""
+
+    @pytest.mark.parametrize("value", ["0", "-2", "many"])
+    def test_rejects_values_below_one(self, index_project, value):
+        with pytest.raises(SystemExit) as exc_info:
+            index_project.main(["--project-path", "/nonexistent", "--jobs", value])
+        assert exc_info.value.code == 2
+
+    def test_default_is_capped(self, index_project):
+        assert 1 <= index_project.DEFAULT_MAX_WORKERS <= 4
@@ -0,0 +1,102 @@
+"""
+Unit tests for the configuration checks in scripts/propios/reset_collections.py.
+"""
+
+import json
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def reset_collections(load_propios_script):
+    return load_propios_script("reset_collections.py")
+
+
+class FakeClient:
+    def __init__(self):
+        self.deleted = []
+        self.created = []
+
+    def delete_collection(self, name):
+        self.deleted.append(name)
+
+    def get_or_create_collection(self, name, embedding_function=None):
+        self.created.append(name)
+
+
+@pytest.fixture
+def fake_connection(monkeypatch):
+    """Replace chroma_mcp_client.connection so main() never imports chromadb."""
+    calls = []
+    client = FakeClient()
+
+    def get_client_and_ef(**kwargs):
+        calls.append(kwargs)
+        return client, None
+
+    connection = types.ModuleType("chroma_mcp_client.connection")
+    connection.get_client_and_ef = get_client_and_ef
+    monkeypatch.setitem(sys.modules, "chroma_mcp_client", types.ModuleType("chroma_mcp_client"))
+    monkeypatch.setitem(sys.modules, "chroma_mcp_client.connection", connection)
+    for name in ("CHROMA_CLIENT_TYPE", "CHROMA_HOST"):
+        monkeypatch.delenv(name, raising=False)
+    return types.SimpleNamespace(calls=calls, client=client)
+
+
+def _project(tmp_path, env, dotenv=None):
+    (tmp_path / ".cursor").mkdir()
+    (tmp_path / ".cursor" / "mcp.json").write_text(json.dumps({"mcpServers": {"chroma": {"env": env}}}))
+    if dotenv is not None:
+        (tmp_path / ".env").write_text(dotenv)
+    return ["--project-path", str(tmp_path)]
+
+
+class TestFailFast:
+    """Test cases for the configuration check before connecting."""
+
+    def test_missing_client_type_everywhere(self, reset_collections, fake_connection, tmp_path, capsys):
+        assert reset_collections.main(_project(tmp_path, {})) == 2
+        assert "CHROMA_CLIENT_TYPE" in capsys.readouterr().err
+        assert fake_connection.calls == []
+
+    def test_http_without_host(self, reset_collections, fake_connection, tmp_path, capsys):
+        assert reset_collections.main(_project(tmp_path, {"CHROMA_CLIENT_TYPE": "http"})) == 2
+        assert "CHROMA_HOST" in capsys.readouterr().err
+        assert fake_connection.calls == []
+
+    def test_values_from_the_project_dotenv(self, reset_collections, fake_connection, tmp_path):
+        argv = _project(tmp_path, {}, dotenv="CHROMA_CLIENT_TYPE=http\nCHROMA_HOST='chroma.local'\n")
+        assert reset_collections.main(argv) == 0
+        assert len(fake_connection.calls) == 1
+        # Only the mcp.json values are passed; get_client_and_ef loads the .env itself
+        assert fake_connection.calls[0]["client_type"] is None
+
+    def test_values_from_the_environment(self, reset_collections, fake_connection, tmp_path, monkeypatch):
+        monkeypatch.setenv("CHROMA_HOST", "chroma.local")
+        assert reset_collections.main(_project(tmp_path, {"CHROMA_CLIENT_TYPE": "http"})) == 0
+        assert fake_connection.calls[0]["client_type"] == "http"
+
+    def test_resets_every_collection(self, reset_collections, fake_connection, tmp_path):
+        assert reset_collections.main(_project(tmp_path, {"CHROMA_CLIENT_TYPE": "persistent"})) == 0
+        assert fake_connection.client.deleted == fake_connection.client.created
+        assert "codebase_v1" in fake_connection.client.deleted
+
+
+class TestWorkers:
+    """Test cases for the number of threads used to delete and recreate."""
+
+    @pytest.mark.parametrize("client_type, expected", [("persistent", 1), ("http", 6), ("cloud", 6)])
+    def test_parallel_only_for_remote_clients(self, reset_collections, fake_connection, tmp_path, monkeypatch, client_type, expected):
+        used = []
+        real_executor = reset_collections.ThreadPoolExecutor
+
+        def _executor(max_workers):
+            used.append(max_workers)
+            return real_executor(max_workers=max_workers)
+
+        monkeypatch.setattr(reset_collections, "ThreadPoolExecutor", _executor)
+        env = {"CHROMA_CLIENT_TYPE": client_type, "CHROMA_HOST": "chroma.local"}
+        assert reset_collections.main(_project(tmp_path, env)) == 0
+        assert used == [expected, expected]
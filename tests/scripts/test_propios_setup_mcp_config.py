@@ -0,0 +1,69 @@
+"""
+Unit tests for the .env parsing (_ENV_RE / load_env_file) in scripts/propios/setup-mcp-config.py.
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def setup_mcp_config(load_propios_script):
+    return load_propios_script("setup-mcp-config.py")
+
+
+def _load(setup_mcp_config, tmp_path, text):
+    env_file = tmp_path / ".env"
+    env_file.write_text(text, encoding="utf-8")
+    return setup_mcp_config.load_env_file(env_file)
+
+
+class TestLoadEnvFile:
+    """Test cases for load_env_file and _ENV_RE."""
+
+    def test_plain_values(self, setup_mcp_config, tmp_path):
+        assert _load(setup_mcp_config, tmp_path, "A=1\nB=two\n") == {"A": "1", "B": "two"}
+
+    def test_comments_and_blank_lines_are_ignored(self, setup_mcp_config, tmp_path):
+        text = "# comment\n\n   \nA=1\n  # indented comment\n"
+        assert _load(setup_mcp_config, tmp_path, text) == {"A": "1"}
+
+    def test_inline_comment_is_stripped(self, setup_mcp_config, tmp_path):
+        assert _load(setup_mcp_config, tmp_path, "KEY=val  # comment\n") == {"KEY": "val"}
+
+    def test_hash_without_leading_space_is_part_of_the_value(self, setup_mcp_config, tmp_path):
+        assert _load(setup_mcp_config, tmp_path, "COLOR=#fff\nURL=a#b\n") == {"COLOR": "#fff", "URL": "a#b"}
+
+    @pytest.mark.parametrize(
+        "line, expected",
+        [
+            ('KEY="quoted value"', "quoted value"),
+            ("KEY='single quoted'", "single quoted"),
+            ('KEY="a # not a comment"', "a # not a comment"),
+            ('KEY="val"  # comment', "val"),
+            ('KEY=""', ""),
+        ],
+    )
+    def test_quoted_values(self, setup_mcp_config, tmp_path, line, expected):
+        assert _load(setup_mcp_config, tmp_path, line + "\n") == {"KEY": expected}
+
+    def test_whitespace_around_key_and_value(self, setup_mcp_config, tmp_path):
+        assert _load(setup_mcp_config, tmp_path, "  KEY =  value  \n") == {"KEY": "value"}
+
+    def test_empty_value(self, setup_mcp_config, tmp_path):
+        assert _load(setup_mcp_config, tmp_path, "KEY=\n") == {"KEY": ""}
+
+    def test_invalid_lines_are_skipped(self, setup_mcp_config, tmp_path):
+        text = "not a pair\n1BAD=x\nGOOD=y\n"
+        assert _load(setup_mcp_config, tmp_path, text) == {"GOOD": "y"}
+
+    def test_last_definition_wins(self, setup_mcp_config, tmp_path):
+        assert _load(setup_mcp_config, tmp_path, "A=1\nA=2\n") == {"A": "2"}
+
+    def test_crlf_line_endings(self, setup_mcp_config, tmp_path):
+        env_file = tmp_path / ".env"
+        env_file.write_bytes(b"A=1\r\nB=2\r\n")
+        assert setup_mcp_config.load_env_file(env_file) == {"A": "1", "B": "2"}
+
+    def test_missing_file_exits(self, setup_mcp_config, tmp_path):
+        with pytest.raises(SystemExit) as exc_info:
+            setup_mcp_config.load_env_file(tmp_path / "missing.env")
+        assert exc_info.value.code == 1
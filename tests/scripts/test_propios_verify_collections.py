@@ -0,0 +1,78 @@
+"""
+Unit tests for delete_ids_in_batches in scripts/propios/verify-collections.py.
+"""
+
+import threading
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def verify_collections(load_propios_script):
+    return load_propios_script("verify-collections.py")
+
+
+class FakeCollection:
+    """Collection stub that records delete() calls and rejects batches above max_batch."""
+
+    def __init__(self, max_batch=None, fail_ids=()):
+        self.max_batch = max_batch
+        self.fail_ids = set(fail_ids)
+        self.calls = []
+        self.deleted = []
+        self._lock = threading.Lock()
+
+    def delete(self, ids):
+        with self._lock:
+            self.calls.append(list(ids))
+        if self.max_batch is not None and len(ids) > self.max_batch:
+            raise ValueError("413 Payload Too Large")
+        if self.fail_ids & set(ids):
+            raise RuntimeError("connection reset")
+        with self._lock:
+            self.deleted.extend(ids)
+
+
+IDS = [f"id{i}" for i in range(10)]
+
+
+class TestDeleteIdsInBatches:
+    """Test cases for delete_ids_in_batches."""
+
+    def test_splits_into_batches(self, verify_collections):
+        collection = FakeCollection()
+        assert verify_collections.delete_ids_in_batches(collection, "c", IDS, batch_size=4) == 10
+        assert sorted(len(call) for call in collection.calls) == [2, 4, 4]
+        assert sorted(collection.deleted) == sorted(IDS)
+
+    def test_empty_ids(self, verify_collections):
+        collection = FakeCollection()
+        assert verify_collections.delete_ids_in_batches(collection, "c", [], batch_size=4) == 0
+        assert collection.calls == []
+
+    def test_too_big_batches_are_halved(self, verify_collections, capsys):
+        collection = FakeCollection(max_batch=2)
+        assert verify_collections.delete_ids_in_batches(collection, "c", IDS[:8], batch_size=8) == 8
+        assert sorted(collection.deleted) == sorted(IDS[:8])
+        # 8 -> 4 + 4 -> four batches of 2
+        assert sorted(len(call) for call in collection.calls) == [2, 2, 2, 2, 4, 4, 8]
+        assert "reintentando con lotes de 4" in capsys.readouterr().out
+
+    def test_single_id_batch_is_not_split(self, verify_collections, capsys):
+        collection = FakeCollection(max_batch=0)
+        assert verify_collections.delete_ids_in_batches(collection, "c", IDS[:1], batch_size=1) == 0
+        assert collection.calls == [IDS[:1]]
+        assert "Error al eliminar lote de c" in capsys.readouterr().out
+
+    def test_other_errors_are_not_retried(self, verify_collections, capsys):
+        collection = FakeCollection(fail_ids={"id0"})
+        assert verify_collections.delete_ids_in_batches(collection, "c", IDS, batch_size=5) == 5
+        assert len(collection.calls) == 2
+        assert sorted(collection.deleted) == IDS[5:]
+        assert "connection reset" in capsys.readouterr().out
+
+    def test_parallel_workers_delete_everything(self, verify_collections):
+        collection = FakeCollection(max_batch=3)
+        ids = [f"id{i}" for i in range(100)]
+        assert verify_collections.delete_ids_in_batches(collection, "c", ids, batch_size=10, max_workers=4) == 100
+        assert sorted(collection.deleted) == sorted(ids)
@@ -184,7 +184,7 @@ def test_parse_args_ssl_variations():
 
 
 @patch("src.chroma_mcp.cli.parse_args")
-@patch("src.chroma_mcp.cli._initialize_chroma_client")
+@patch("chroma_mcp.server._initialize_chroma_client")
 @patch("asyncio.run")  # Patch asyncio.run used in stdio path
 def test_cli_main_stdio_keyboard_interrupt(mock_asyncio_run, mock_init_client, mock_parse_args):
     """Test cli.main() handles KeyboardInterrupt gracefully in stdio mode."""
@@ -204,7 +204,7 @@ def test_cli_main_stdio_keyboard_interrupt(mock_asyncio_run, mock_init_client, m
 
 
 @patch("src.chroma_mcp.cli.parse_args")
-@patch("src.chroma_mcp.cli._initialize_chroma_client")
+@patch("chroma_mcp.server._initialize_chroma_client")
 @patch("asyncio.run")  # Patch asyncio.run used in stdio path
 def test_cli_main_stdio_generic_exception(mock_asyncio_run, mock_init_client, mock_parse_args):
     """Test cli.main() handles generic Exceptions gracefully in stdio mode."""
@@ -225,8 +225,8 @@ def test_cli_main_stdio_generic_exception(mock_asyncio_run, mock_init_client, mo
 
 
 @patch("src.chroma_mcp.cli.parse_args")
-@patch("src.chroma_mcp.cli.config_server")  # Patch config_server called in http path
-@patch("src.chroma_mcp.cli.server_main")  # Patch server_main called in http path
+@patch("chroma_mcp.server.config_server")  # Patch config_server called in http path
+@patch("chroma_mcp.server.main")  # Patch server_main called in http path
 def test_cli_main_http_keyboard_interrupt(mock_server_main, mock_config_server, mock_parse_args):
     """Test cli.main() handles KeyboardInterrupt gracefully in http mode."""
     mock_args = MagicMock()
@@ -243,8 +243,8 @@ def test_cli_main_http_keyboard_interrupt(mock_server_main, mock_config_server,
 
 
 @patch("src.chroma_mcp.cli.parse_args")
-@patch("src.chroma_mcp.cli.config_server")  # Patch config_server called in http path
-@patch("src.chroma_mcp.cli.server_main")  # Patch server_main called in http path
+@patch("chroma_mcp.server.config_server")  # Patch config_server called in http path
+@patch("chroma_mcp.server.main")  # Patch server_main called in http path
 def test_cli_main_http_generic_exception(mock_server_main, mock_config_server, mock_parse_args):
     """Test cli.main() handles generic Exceptions gracefully in http mode."""
     mock_args = MagicMock()
@@ -262,8 +262,8 @@ def test_cli_main_http_generic_exception(mock_server_main, mock_config_server, m
 
 
 @patch("src.chroma_mcp.cli.parse_args")
-@patch("src.chroma_mcp.cli.config_server")  # Patch config_server called in http path
-@patch("src.chroma_mcp.cli.server_main")  # Patch server_main called in http path
+@patch("chroma_mcp.server.config_server")  # Patch config_server called in http path
+@patch("chroma_mcp.server.main")  # Patch server_main called in http path
 def test_cli_main_http_success(mock_server_main, mock_config_server, mock_parse_args):
     """Test cli.main() successful execution in http mode."""
     mock_args = MagicMock()